@@ -0,0 +1,221 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli <command> [options]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date
+from uuid import UUID
+
+from app.db.session import SessionLocal
+from app.idempotency import purge_expired_keys
+from app.services.anomaly_service import detect_anomalies
+from app.services.budget_alert_service import drain_alerts, sync_spent
+from app.services.budget_service import rollover_budgets
+from app.services import planner_batch_service
+from app.services.rollup_service import rebuild_rollups
+
+
+def purge_idempotency_keys(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        removed = purge_expired_keys(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Removed {removed} expired idempotency keys")
+
+
+def rebuild_transaction_rollups(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, user_id=args.user_id)
+    finally:
+        db.close()
+    print(f"Rebuilt {written} monthly rollup rows")
+
+
+def detect_transaction_anomalies(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        written = detect_anomalies(
+            db,
+            recent_days=args.days,
+            history_days=args.history_days,
+            threshold=args.threshold,
+            min_history=args.min_history,
+        )
+    finally:
+        db.close()
+    print(f"Flagged {written} anomalous transactions")
+
+
+def _print_alerts(alerts) -> None:
+    for alert in alerts:
+        sys.stdout.write(
+            json.dumps(
+                {
+                    "id": alert.id,
+                    "user_id": str(alert.user_id),
+                    "budget_id": str(alert.budget_id),
+                    "category": alert.category,
+                    "threshold": alert.threshold,
+                    "limit_amount": str(alert.limit_amount),
+                    "spent": str(alert.spent),
+                    "created_at": alert.created_at.isoformat(),
+                }
+            )
+            + "\n"
+        )
+    sys.stdout.flush()
+
+
+def drain_budget_alerts(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        drain_alerts(db, _print_alerts, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+
+def rebuild_budget_counters(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        updated = sync_spent(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Recomputed spent for {updated} budget categories")
+
+
+def rollover_monthly_budgets(args: argparse.Namespace) -> None:
+    today = date.today()
+    db = SessionLocal()
+    try:
+        created = rollover_budgets(
+            db,
+            year=args.year or today.year,
+            month=args.month or today.month,
+            carry_over=args.carry_over,
+        )
+    finally:
+        db.close()
+    print(f"Created {len(created)} budgets")
+
+
+def run_planner_batch(args: argparse.Namespace) -> None:
+    as_of = args.as_of or date.today()
+    executor = planner_batch_service.make_executor(args.workers)
+    try:
+        chunks = planner_batch_service.run_batch(
+            executor,
+            max_in_flight=2 * args.workers,
+            chunk_size=args.chunk_size,
+            user_ids=args.user_id,
+        )
+        if args.output == "ndjson":
+            for data in planner_batch_service.iter_ndjson(chunks, as_of):
+                sys.stdout.buffer.write(data)
+            sys.stdout.flush()
+            return
+
+        db = SessionLocal()
+        try:
+            written = planner_batch_service.write_snapshots(db, chunks, as_of)
+        finally:
+            db.close()
+        print(f"Wrote {written} planner snapshots for {as_of}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    purge = commands.add_parser(
+        "purge-idempotency-keys",
+        help="Delete stored Idempotency-Key responses past their TTL",
+    )
+    purge.add_argument("--batch-size", type=int, default=10_000)
+    purge.set_defaults(func=purge_idempotency_keys)
+
+    rollups = commands.add_parser(
+        "rebuild-rollups",
+        help="Recompute transaction_monthly_rollups from raw transactions",
+    )
+    rollups.add_argument("--user-id", type=UUID, default=None)
+    rollups.set_defaults(func=rebuild_transaction_rollups)
+
+    anomalies = commands.add_parser(
+        "detect-anomalies",
+        help="Flag recent expenses that are outliers for the user's category (nightly)",
+    )
+    anomalies.add_argument("--days", type=int, default=1, help="Score expenses from the last N days")
+    anomalies.add_argument("--history-days", type=int, default=365)
+    anomalies.add_argument("--threshold", type=float, default=3.5)
+    anomalies.add_argument("--min-history", type=int, default=8)
+    anomalies.set_defaults(func=detect_transaction_anomalies)
+
+    alerts = commands.add_parser(
+        "drain-budget-alerts",
+        help="Deliver queued budget alerts as NDJSON on stdout and remove them",
+    )
+    alerts.add_argument("--batch-size", type=int, default=500)
+    alerts.set_defaults(func=drain_budget_alerts)
+
+    counters = commands.add_parser(
+        "rebuild-budget-counters",
+        help="Recompute budget category spent counters from the monthly rollups",
+    )
+    counters.set_defaults(func=rebuild_budget_counters)
+
+    rollover = commands.add_parser(
+        "rollover-budgets",
+        help="Copy each user's latest budget into a month (default: current month)",
+    )
+    rollover.add_argument("--year", type=int, default=None)
+    rollover.add_argument("--month", type=int, choices=range(1, 13), default=None)
+    rollover.add_argument(
+        "--carry-over",
+        action="store_true",
+        help="Add unspent amounts from the source month to the new limits",
+    )
+    rollover.set_defaults(func=rollover_monthly_budgets)
+
+    batch = commands.add_parser(
+        "run-planner-batch",
+        help="Planner report for every user, as NDJSON on stdout or into planner_snapshots",
+    )
+    batch.add_argument("--output", choices=("ndjson", "snapshot"), default="ndjson")
+    batch.add_argument("--chunk-size", type=int, default=planner_batch_service.CHUNK_USERS)
+    batch.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (1 runs in-process)",
+    )
+    batch.add_argument(
+        "--user-id",
+        type=UUID,
+        action="append",
+        default=None,
+        help="Only these users (repeatable)",
+    )
+    batch.add_argument("--as-of", type=date.fromisoformat, default=None)
+    batch.set_defaults(func=run_planner_batch)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
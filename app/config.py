@@ -1,6 +1,36 @@
 from dotenv import load_dotenv
 import os
+import tempfile
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+
+# How long a stored Idempotency-Key response can be replayed
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+
+# Shared on-disk columnar transaction cache (empty string disables it)
+TRANSACTION_CACHE_DIR = os.getenv(
+    "TRANSACTION_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "pft-transaction-cache"),
+)
+TRANSACTION_CACHE_MAX_BYTES = int(
+    os.getenv("TRANSACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+# Budget utilization percentages that raise an alert when crossed
+BUDGET_ALERT_THRESHOLDS = tuple(
+    int(t) for t in os.getenv("BUDGET_ALERT_THRESHOLDS", "80,100").split(",") if t.strip()
+)
+
+# Worker processes for CPU-bound planner runs (1 runs them in-process)
+PLANNER_WORKERS = int(os.getenv("PLANNER_WORKERS", str(min(os.cpu_count() or 1, 4))))
+
+# Memoized planner results: TTL (0 disables), in-process LRU size, and an
+# optional Redis-compatible URL shared by all workers
+PLANNER_CACHE_TTL_SECONDS = int(os.getenv("PLANNER_CACHE_TTL_SECONDS", "300"))
+PLANNER_CACHE_MAX_ENTRIES = int(os.getenv("PLANNER_CACHE_MAX_ENTRIES", "10000"))
+PLANNER_CACHE_URL = os.getenv("PLANNER_CACHE_URL", "")
+
+# Shared secret for /admin endpoints (X-Admin-Token); empty disables them
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
@@ -1,6 +1,7 @@
 # app/db/models.py
 import uuid
 from sqlalchemy import (
+    BigInteger,
     Column,
     String,
     Float,
@@ -10,10 +11,12 @@ from sqlalchemy import (
     Numeric,
     DateTime,
     ForeignKey,
+    Index,
+    LargeBinary,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.db.base import Base
 
 
@@ -69,11 +72,50 @@ class Transaction(Base):
     amount = Column(Float, nullable=False)
     payment_mode = Column(String(50), nullable=True)
 
+    content_hash = Column(
+        String(64),
+        nullable=True,
+        comment="sha256 of (user, date, amount, category, payment_mode) used to dedupe imports",
+    )
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="transactions")
     wallet = relationship("Wallet")
 
+    # Composite indexes backing the keyset-paginated list endpoint:
+    # every variant ends in (date, id) so deep pages stay index range scans.
+    __table_args__ = (
+        Index("ix_transactions_user_id_date_id", "user_id", "date", "id"),
+        Index(
+            "ix_transactions_user_id_category_date_id",
+            "user_id",
+            "category",
+            "date",
+            "id",
+        ),
+        Index(
+            "ix_transactions_user_id_type_date_id",
+            "user_id",
+            "type",
+            "date",
+            "id",
+        ),
+        Index(
+            "ix_transactions_user_id_wallet_id_date_id",
+            "user_id",
+            "wallet_id",
+            "date",
+            "id",
+        ),
+        # Import dedupe anti-join
+        Index(
+            "ix_transactions_user_id_content_hash",
+            "user_id",
+            "content_hash",
+        ),
+    )
+
 
 class Debt(Base):
     __tablename__ = "debts"
@@ -97,12 +139,18 @@ class Debt(Base):
     is_flexible = Column(Boolean, default=False)
     priority = Column(Integer, default=0)
     status = Column(String(50), default="active")
+    # Bumped by every write (ORM or payment UPDATE) for optimistic locking
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="debts")
     wallet = relationship("Wallet")
-    payments = relationship("Payment", back_populates="debt")
+    payments = relationship(
+        "Payment", back_populates="debt", cascade="all, delete-orphan"
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 class Payment(Base):
@@ -129,6 +177,11 @@ class Payment(Base):
     debt = relationship("Debt", back_populates="payments")
     wallet = relationship("Wallet")
 
+    # Per-debt payment history, keyset-paginated on (payment_date, id)
+    __table_args__ = (
+        Index("ix_payments_debt_id_payment_date_id", "debt_id", "payment_date", "id"),
+    )
+
 
 class RecurringTransaction(Base):
     __tablename__ = "recurring_transactions"
@@ -189,6 +242,19 @@ class Budget(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # One budget per user, wallet and month; "no wallet" counts as a
+        # wallet of its own (same nil-UUID sentinel as the rollups)
+        Index(
+            "uq_budgets_user_id_wallet_id_year_month",
+            "user_id",
+            text("coalesce(wallet_id, '00000000-0000-0000-0000-000000000000'::uuid)"),
+            "year",
+            "month",
+            unique=True,
+        ),
+    )
+
 
 class BudgetCategory(Base):
     __tablename__ = "budget_categories"
@@ -198,6 +264,13 @@ class BudgetCategory(Base):
 
     category = Column(String(100), nullable=False)
     limit_amount = Column(Numeric(12, 2), nullable=False)
+    spent = Column(
+        Numeric(14, 2),
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Running expense total for the budget month, maintained on every transaction write",
+    )
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -221,3 +294,162 @@ class WalletMember(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     wallet = relationship("Wallet", back_populates="members")
+
+
+class TransactionMonthlyRollup(Base):
+    """
+    Per-month aggregate of transactions, maintained on every write.
+
+    Rows without a wallet use the nil UUID in `wallet_id` so it can be part
+    of the primary key.
+    """
+
+    __tablename__ = "transaction_monthly_rollups"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    wallet_id = Column(UUID(as_uuid=True), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    type = Column(String(50), primary_key=True)
+    category = Column(String(100), primary_key=True)
+
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    key = Column(String(255), primary_key=True)
+
+    request_fingerprint = Column(String(64), nullable=False)
+    # NULL while the request that claimed the key is still running
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Anomaly(Base):
+    """
+    A transaction flagged as unusual against the user's own history in
+    its category (robust z-score over median / MAD).
+    """
+
+    __tablename__ = "anomalies"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    transaction_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("transactions.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+
+    date = Column(Date, nullable=False)
+    category = Column(String(100), nullable=False)
+    amount = Column(Float, nullable=False)
+
+    median = Column(Float, nullable=False)
+    mad = Column(Float, nullable=False, comment="Scaled to a standard deviation")
+    score = Column(Float, nullable=False, comment="Robust z-score, (amount - median) / mad")
+    history_size = Column(Integer, nullable=False)
+
+    detected_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_anomalies_user_id_date", "user_id", "date"),
+    )
+
+
+class BudgetAlertOutbox(Base):
+    """
+    Budget threshold crossings waiting to be delivered.
+
+    Rows are written in the same DB transaction as the spending that
+    crossed the threshold and deleted by the consumer once delivered.
+    Budget ids are kept as plain values so deleting or editing a budget
+    does not discard alerts already raised.
+    """
+
+    __tablename__ = "budget_alert_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    budget_id = Column(UUID(as_uuid=True), nullable=False)
+    budget_category_id = Column(UUID(as_uuid=True), nullable=False)
+
+    category = Column(String(100), nullable=False)
+    threshold = Column(Integer, nullable=False, comment="Utilization percent that was crossed")
+    limit_amount = Column(Numeric(12, 2), nullable=False)
+    spent = Column(Numeric(14, 2), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SavingsGoal(Base):
+    __tablename__ = "savings_goals"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    wallet_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("wallets.id"),
+        nullable=True,
+        comment="Optional wallet this goal saves into",
+    )
+
+    name = Column(String(255), nullable=False)
+    target_amount = Column(Numeric(12, 2), nullable=False)
+    current_amount = Column(Numeric(12, 2), nullable=False, default=0)
+
+    # Contribution schedule: `contribution_amount` every period
+    # (weekly, monthly, quarterly or yearly) from start_date to end_date
+    contribution_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    contribution_frequency = Column(String(20), nullable=False, default="monthly")
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+
+    annual_interest_rate = Column(
+        Numeric(5, 2),
+        nullable=True,
+        comment="Percent per year, compounded monthly",
+    )
+    target_date = Column(Date, nullable=True, comment="Deadline for reaching the target")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User")
+    wallet = relationship("Wallet")
+
+    __table_args__ = (
+        Index("ix_savings_goals_user_id", "user_id"),
+    )
+
+
+class PlannerSnapshot(Base):
+    """
+    One user's planner report (summary and debt plan) from a batch run.
+
+    At most one per user and day; re-running a batch replaces it.
+    """
+
+    __tablename__ = "planner_snapshots"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    as_of = Column(Date, nullable=False)
+
+    summary = Column(JSONB, nullable=False)
+    debt_plan = Column(JSONB(none_as_null=True), nullable=True)
+    error = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("uq_planner_snapshots_user_id_as_of", "user_id", "as_of", unique=True),
+    )
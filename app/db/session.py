@@ -1,3 +1,4 @@
+from fastapi import Request
 from sqlalchemy.orm import sessionmaker
 from .database import engine
 
@@ -7,7 +8,14 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
-def get_db():
+def get_db(request: Request):
+    # IdempotentRoute opens the request's session before the handler runs,
+    # so claiming the key, the handler and storing the response share it
+    db = getattr(request.state, "db", None)
+    if db is not None:
+        yield db
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -1,8 +1,10 @@
+import hmac
 from uuid import UUID
 
 from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.config import ADMIN_API_TOKEN
 from app.db.session import get_db
 from app.db import models
 
@@ -53,3 +55,29 @@ def get_current_user_id(user: models.User = Depends(get_current_user)) -> UUID:
     """
     return user.id
 
+
+
+def require_admin(
+    x_admin_token: str | None = Header(
+        default=None,
+        alias="X-Admin-Token",
+        description="Must match ADMIN_API_TOKEN",
+    ),
+) -> None:
+    """
+    Guard for cross-user admin endpoints: a shared secret from the
+    environment until real roles exist. Disabled when ADMIN_API_TOKEN is
+    not set.
+    """
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled (ADMIN_API_TOKEN is not set)",
+        )
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(), ADMIN_API_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid X-Admin-Token",
+        )
@@ -0,0 +1,258 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Callable, TypeVar
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import Row, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import IDEMPOTENCY_KEY_TTL_SECONDS
+from app.db.models import IdempotencyKey
+from app.db.session import SessionLocal
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+T = TypeVar("T")
+
+
+def _fingerprint(request: Request, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.url.path.encode())
+    digest.update(request.url.query.encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _committed(db: Session, fn: Callable[..., T], *args) -> T:
+    """
+    Run `fn(db, *args)` as a transaction of its own. The session hands
+    its connection back to the pool on commit, so none is held while the
+    route handler runs.
+    """
+    try:
+        result = fn(db, *args)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _claim(
+    db: Session,
+    user_id: UUID,
+    key: str,
+    fingerprint: str,
+) -> Row | None:
+    """
+    Reserve (user, key) for this request, or return the live record that
+    already holds it.
+
+    The reservation is a placeholder row without a response, written with
+    INSERT ... ON CONFLICT DO UPDATE ... WHERE expires_at <= now(), so a
+    free key or an expired record is claimed in one statement and a live
+    one is left alone. A concurrent duplicate waits on the row lock only
+    for the few milliseconds until the claim commits, not for the handler.
+    """
+    row = {
+        "user_id": user_id,
+        "key": key,
+        "request_fingerprint": fingerprint,
+        "status_code": None,
+        "content_type": None,
+        "response_body": None,
+        "expires_at": datetime.now(timezone.utc)
+        + timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS),
+    }
+    stmt = insert(IdempotencyKey).values(**row)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            **{k: stmt.excluded[k] for k in row if k not in ("user_id", "key")},
+            "created_at": func.now(),
+        },
+        where=IdempotencyKey.expires_at <= func.now(),
+    ).returning(IdempotencyKey.key)
+    if db.execute(stmt).first() is not None:
+        return None
+
+    # The conflicting row is locked by the statement above, so it is there
+    return db.execute(
+        select(
+            IdempotencyKey.request_fingerprint,
+            IdempotencyKey.status_code,
+            IdempotencyKey.content_type,
+            IdempotencyKey.response_body,
+        ).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+        )
+    ).one()
+
+
+def _store(
+    db: Session,
+    user_id: UUID,
+    key: str,
+    response: Response,
+) -> None:
+    """Fill the placeholder claimed by this request with its response."""
+    db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+        )
+        .values(
+            status_code=response.status_code,
+            content_type=response.headers.get("content-type"),
+            response_body=bytes(response.body),
+        )
+    )
+
+
+def _release(db: Session, user_id: UUID, key: str) -> None:
+    """Drop an unfilled placeholder so the key can be retried."""
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+        )
+    )
+
+
+def purge_expired_keys(db: Session, batch_size: int = 10_000) -> int:
+    """
+    Delete expired idempotency records in bounded batches.
+
+    Returns the number of rows removed.
+    """
+    removed = 0
+    while True:
+        expired = (
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at <= func.now())
+            .limit(batch_size)
+        )
+        result = db.execute(
+            delete(IdempotencyKey).where(
+                tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(expired)
+            )
+        )
+        db.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            return removed
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route class that makes POST handlers honour an `Idempotency-Key` header.
+
+    The first request with a given key claims it with a placeholder record
+    (committed before the handler runs), and its successful response is
+    then stored in that record. Retries with the same key are answered
+    from the stored response without running the handler; a retry that
+    arrives while the first request is still running gets 409, and
+    reusing a key for a different request is rejected with 422. Failed
+    requests release the key so they can be retried.
+
+    Claiming, the handler and storing the response all use the request's
+    one session (get_db reuses it), each step in its own short
+    transaction, so a request needs a single pooled connection and holds
+    none between steps. If the process dies after the
+    handler's commit but before the response is stored, the key stays
+    claimed until it expires, so a retry is refused rather than repeating
+    the write.
+
+    Multipart uploads are passed through untouched so they are not
+    buffered just to be fingerprinted.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if "POST" not in self.methods:
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            content_type = request.headers.get("content-type", "")
+            if key is None or content_type.startswith("multipart/"):
+                return await handler(request)
+
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={
+                        "detail": f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"
+                    },
+                )
+
+            try:
+                user_id = UUID(request.headers.get("X-User-Id", ""))
+            except ValueError:
+                # Let the handler's own dependency report the auth error
+                return await handler(request)
+
+            fingerprint = _fingerprint(request, await request.body())
+
+            # The handler's get_db picks this session up from request.state
+            db = SessionLocal()
+            request.state.db = db
+            try:
+                stored = await run_in_threadpool(
+                    _committed, db, _claim, user_id, key, fingerprint
+                )
+                if stored is not None:
+                    if stored.request_fingerprint != fingerprint:
+                        return JSONResponse(
+                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            content={
+                                "detail": f"{IDEMPOTENCY_HEADER} was already used for a different request"
+                            },
+                        )
+                    if stored.status_code is None:
+                        return JSONResponse(
+                            status_code=status.HTTP_409_CONFLICT,
+                            content={
+                                "detail": f"A request with this {IDEMPOTENCY_HEADER} is still in progress"
+                            },
+                            headers={"Retry-After": "1"},
+                        )
+                    return Response(
+                        content=stored.response_body,
+                        status_code=stored.status_code,
+                        media_type=stored.content_type,
+                        headers={REPLAYED_HEADER: "true"},
+                    )
+
+                try:
+                    response = await handler(request)
+                except Exception:
+                    await run_in_threadpool(db.rollback)
+                    await run_in_threadpool(_committed, db, _release, user_id, key)
+                    raise
+
+                # Whatever the handler left uncommitted is not part of its result
+                await run_in_threadpool(db.rollback)
+                if 200 <= response.status_code < 300 and not isinstance(
+                    response, StreamingResponse
+                ):
+                    await run_in_threadpool(_committed, db, _store, user_id, key, response)
+                else:
+                    await run_in_threadpool(_committed, db, _release, user_id, key)
+                return response
+            finally:
+                await run_in_threadpool(db.close)
+
+        return idempotent_handler
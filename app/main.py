@@ -2,7 +2,18 @@ from fastapi import FastAPI
 
 from app.db.database import engine
 from app.db.models import Base
-from app.routes import transactions, debts, planner, user, budgets, recurring, wallets
+from app.routes import (
+    admin,
+    analytics,
+    budgets,
+    debts,
+    goals,
+    planner,
+    recurring,
+    transactions,
+    user,
+    wallets,
+)
 
 app = FastAPI(title="Personal Finance Manager")
 
@@ -11,10 +22,13 @@ Base.metadata.create_all(bind=engine)
 app.include_router(transactions.router)
 app.include_router(debts.router)
 app.include_router(planner.router)
+app.include_router(goals.router)
 app.include_router(user.router)
 app.include_router(budgets.router)
 app.include_router(recurring.router)
 app.include_router(wallets.router)
+app.include_router(analytics.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
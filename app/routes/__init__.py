@@ -1 +1,12 @@
-from . import transactions, debts, planner, user, budgets, recurring, wallets
\ No newline at end of file
+from . import (
+    admin,
+    analytics,
+    budgets,
+    debts,
+    goals,
+    planner,
+    recurring,
+    transactions,
+    user,
+    wallets,
+)
@@ -0,0 +1,55 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.config import PLANNER_WORKERS
+from app.db.session import get_db
+from app.dependencies import require_admin
+from app.services import planner_batch_service
+from app.services.debt_strategy_service import get_executor
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.post(
+    "/planner/batch",
+    status_code=status.HTTP_200_OK,
+)
+def run_planner_batch(
+    output: str = Query(
+        "ndjson",
+        pattern="^(ndjson|snapshot)$",
+        description="ndjson: stream one report per user; snapshot: store in planner_snapshots",
+    ),
+    chunk_size: int = Query(planner_batch_service.CHUNK_USERS, ge=1, le=10_000),
+    as_of: date | None = Query(default=None, description="Report date (default: today)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Planner report (summary and debt plan) for every user.
+
+    Simulations run in the shared planner process pool (PLANNER_WORKERS).
+    For large user bases prefer `python -m app.cli run-planner-batch`,
+    which sizes its own pool.
+    """
+    as_of = as_of or date.today()
+    chunks = planner_batch_service.run_batch(
+        get_executor(),
+        max_in_flight=2 * PLANNER_WORKERS,
+        chunk_size=chunk_size,
+    )
+
+    if output == "ndjson":
+        return StreamingResponse(
+            planner_batch_service.iter_ndjson(chunks, as_of),
+            media_type="application/x-ndjson",
+        )
+
+    written = planner_batch_service.write_snapshots(db, chunks, as_of)
+    return {"as_of": as_of, "snapshots": written}
@@ -0,0 +1,85 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.dependencies import get_current_user_id
+from app.schemas.analytics import AnomalyResponse, TrendsResponse
+from app.services import analytics_service, anomaly_service
+
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get(
+    "/trends",
+    response_model=TrendsResponse,
+    status_code=status.HTTP_200_OK,
+)
+def get_spending_trends(
+    date_from: date | None = Query(
+        default=None,
+        alias="from",
+        description="Defaults to the start of the month 11 months before 'to'",
+    ),
+    date_to: date | None = Query(
+        default=None,
+        alias="to",
+        description="Defaults to today",
+    ),
+    granularity: str = Query(default="month", pattern="^(week|month)$"),
+    window: int = Query(default=3, ge=1, le=52, description="Moving-average length in periods"),
+    type: str = Query(default="Expense", examples=["Income", "Expense"]),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Spend per category per week or month with moving averages and
+    period-over-period deltas, shaped as one column per category for
+    charting.
+    """
+    if date_to is None:
+        date_to = date.today()
+    if date_from is None:
+        months = date_to.year * 12 + date_to.month - 1 - 11
+        date_from = date(months // 12, months % 12 + 1, 1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'",
+        )
+
+    return analytics_service.get_spending_trends(
+        db,
+        user_id,
+        date_from,
+        date_to,
+        granularity=granularity,
+        window=window,
+        tx_type=type,
+    )
+
+
+@router.get(
+    "/anomalies",
+    response_model=list[AnomalyResponse],
+    status_code=status.HTTP_200_OK,
+)
+def list_anomalies(
+    date_from: date | None = Query(default=None, alias="from"),
+    date_to: date | None = Query(default=None, alias="to"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Expenses flagged by the nightly anomaly job, newest first.
+    """
+    return anomaly_service.list_anomalies(
+        db,
+        user_id,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+    )
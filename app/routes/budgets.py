@@ -1,15 +1,21 @@
+from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.dependencies import get_current_user_id
-from app.schemas.budget import BudgetCreate, BudgetResponse, BudgetSummary
+from app.idempotency import IdempotentRoute
+from app.schemas.budget import BudgetCreate, BudgetReport, BudgetResponse, BudgetSummary
 from app.services import budget_service
 
 
-router = APIRouter(prefix="/budgets", tags=["Budgets"])
+router = APIRouter(
+    prefix="/budgets",
+    tags=["Budgets"],
+    route_class=IdempotentRoute,
+)
 
 
 @router.get(
@@ -44,6 +50,52 @@ def create_budget(
     return budget
 
 
+@router.post(
+    "/rollover",
+    response_model=list[BudgetResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+def rollover_budgets(
+    year: int | None = Query(default=None, ge=2000, le=3000),
+    month: int | None = Query(default=None, ge=1, le=12),
+    carry_over: bool = Query(default=False, description="Add unspent amounts to the new limits"),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Copy the latest earlier budget into the given month (default: the
+    current month). Returns the budgets created, empty if the month
+    already has one.
+    """
+    today = date.today()
+    budget_ids = budget_service.rollover_budgets(
+        db,
+        year=year or today.year,
+        month=month or today.month,
+        carry_over=carry_over,
+        user_id=user_id,
+    )
+    if not budget_ids:
+        return []
+    return budget_service.list_budgets(db, user_id, budget_ids=budget_ids)
+
+
+@router.get(
+    "/report",
+    response_model=BudgetReport,
+    status_code=status.HTTP_200_OK,
+)
+def get_budget_report(
+    year: int = Query(..., ge=2000, le=3000),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Budget vs actual for every budgeted month and category of a year.
+    """
+    return budget_service.get_budget_report(db, user_id, year)
+
+
 @router.get(
     "/{budget_id}",
     response_model=BudgetSummary,
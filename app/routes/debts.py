@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
 from uuid import UUID
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.db.session import get_db
 from app.db import models
 from app.schemas.debt import DebtCreate, DebtResponse
+from app.schemas.payment import PaymentCreate, PaymentReceipt, PaymentResponse
 from app.dependencies import get_current_user_id
+from app.idempotency import IdempotentRoute
+from app.services import payment_service, planner_cache
 
-router = APIRouter(prefix="/debts", tags=["Debts"])
+router = APIRouter(
+    prefix="/debts",
+    tags=["Debts"],
+    route_class=IdempotentRoute,
+)
 
 
 @router.get(
@@ -84,6 +92,7 @@ def create_debt(
     )
 
     db.add(debt)
+    planner_cache.bump_on_commit(db, [user_id])
     db.commit()
     db.refresh(debt)
 
@@ -130,7 +139,8 @@ def update_debt(
     debt.priority = payload.priority
 
     db.add(debt)
-    db.commit()
+    planner_cache.bump_on_commit(db, [user_id])
+    _commit_or_conflict(db)
     db.refresh(debt)
 
     return debt
@@ -163,5 +173,146 @@ def delete_debt(
         )
 
     db.delete(debt)
-    db.commit()
+    planner_cache.bump_on_commit(db, [user_id])
+    _commit_or_conflict(db)
+
+
+def _commit_or_conflict(db: Session) -> None:
+    """
+    Commit an ORM write to a debt; the version check fails with 409 when
+    a payment (or another edit) landed after the debt was loaded.
+    """
+    try:
+        db.commit()
+    except StaleDataError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Debt was modified concurrently; reload and retry",
+        ) from exc
+
+
+def _record(
+    db: Session,
+    user_id,
+    debt_id: UUID,
+    items: list[PaymentCreate],
+    expected_version: int | None,
+) -> dict:
+    try:
+        receipt = payment_service.record_payments(
+            db, user_id, debt_id, items, expected_version=expected_version
+        )
+    except payment_service.DebtVersionConflict as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    if receipt is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Debt not found",
+        )
+    return receipt
+
+
+@router.post(
+    "/{debt_id}/payments",
+    response_model=PaymentReceipt,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_payment(
+    debt_id: UUID,
+    payload: PaymentCreate,
+    expected_version: int | None = Query(
+        default=None,
+        ge=0,
+        description="Only apply if the debt is still at this version (409 otherwise)",
+    ),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Record a payment against a debt and reduce its remaining amount.
+    """
+    return _record(db, user_id, debt_id, [payload], expected_version)
+
+
+@router.post(
+    "/{debt_id}/payments/bulk",
+    response_model=PaymentReceipt,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_payments_bulk(
+    debt_id: UUID,
+    items: list[PaymentCreate] = Body(
+        ...,
+        min_length=1,
+        max_length=payment_service.MAX_BULK_PAYMENTS,
+    ),
+    expected_version: int | None = Query(
+        default=None,
+        ge=0,
+        description="Only apply if the debt is still at this version (409 otherwise)",
+    ),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Record many payments against a debt, all or nothing: the balance
+    moves once by their total.
+    """
+    return _record(db, user_id, debt_id, items, expected_version)
+
+
+@router.get(
+    "/{debt_id}/payments",
+    response_model=list[PaymentResponse],
+    status_code=status.HTTP_200_OK,
+)
+def get_payments(
+    debt_id: UUID,
+    response: Response,
+    cursor: str | None = Query(
+        default=None,
+        description="Opaque cursor from the previous page's X-Next-Cursor header",
+    ),
+    limit: int = Query(
+        default=payment_service.DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=payment_service.MAX_PAGE_SIZE,
+    ),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Payment history of a debt, newest first.
+
+    Keyset-paginated on (payment_date, id); when more rows exist the
+    cursor for the next page is returned in the `X-Next-Cursor` header.
+    """
+    try:
+        page = payment_service.list_payments(
+            db, user_id, debt_id, cursor=cursor, limit=limit
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Debt not found",
+        )
+
+    items, next_cursor = page
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
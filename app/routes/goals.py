@@ -0,0 +1,143 @@
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.dependencies import get_current_user_id
+from app.idempotency import IdempotentRoute
+from app.schemas.savings_goal import (
+    GoalsOverview,
+    SavingsGoalCreate,
+    SavingsGoalResponse,
+)
+from app.services import planner_cache, savings_goal_service
+
+
+router = APIRouter(
+    prefix="/planner/goals",
+    tags=["Planner"],
+    route_class=IdempotentRoute,
+)
+
+
+@router.get(
+    "/",
+    response_model=list[SavingsGoalResponse],
+    status_code=status.HTTP_200_OK,
+)
+def list_goals(
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    return savings_goal_service.list_goals(db, user_id)
+
+
+@router.get(
+    "/projections",
+    response_model=GoalsOverview,
+    status_code=status.HTTP_200_OK,
+)
+def get_goal_projections(
+    include_projection: bool = Query(
+        default=False,
+        description="Add each goal's month-end balances from this month on",
+    ),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    All savings goals of the current user with their projections:
+    completion date, balance at the deadline, shortfall and the extra
+    monthly contribution that would close it.
+    """
+    today = date.today()
+    return planner_cache.cached(
+        "goals",
+        user_id,
+        (today, include_projection),
+        lambda: savings_goal_service.goal_projections(
+            db, user_id, include_projection=include_projection, today=today
+        ),
+    )
+
+
+@router.get(
+    "/{goal_id}",
+    response_model=SavingsGoalResponse,
+    status_code=status.HTTP_200_OK,
+)
+def get_goal(
+    goal_id: UUID,
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    goal = savings_goal_service.get_goal(db, user_id, goal_id)
+    if not goal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Savings goal not found",
+        )
+    return goal
+
+
+@router.post(
+    "/",
+    response_model=SavingsGoalResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_goal(
+    payload: SavingsGoalCreate,
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    try:
+        return savings_goal_service.create_goal(db, user_id, payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+
+@router.put(
+    "/{goal_id}",
+    response_model=SavingsGoalResponse,
+    status_code=status.HTTP_200_OK,
+)
+def update_goal(
+    goal_id: UUID,
+    payload: SavingsGoalCreate,
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    try:
+        goal = savings_goal_service.update_goal(db, user_id, goal_id, payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    if not goal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Savings goal not found",
+        )
+    return goal
+
+
+@router.delete(
+    "/{goal_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+def delete_goal(
+    goal_id: UUID,
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    if not savings_goal_service.delete_goal(db, user_id, goal_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Savings goal not found",
+        )
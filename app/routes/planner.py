@@ -1,16 +1,40 @@
 # app/routes/planner.py
-from fastapi import APIRouter, Depends, Query
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.db import models
 from app.dependencies import get_current_user_id
-from app.schemas.planner import FinancialSummary, DebtPlanResponse
+from app.services import planner_cache
+from app.schemas.planner import (
+    AllocationPlan,
+    BalanceForecast,
+    DebtPlanResponse,
+    DebtSolveResponse,
+    DebtStrategiesResponse,
+    FinancialSummary,
+    MonteCarloPlan,
+)
 from app.services.planner_service import (
     calculate_financial_summary,
+    load_debt_items,
     run_financial_planner,
 )
-from app.services.debt_simulator import DebtItem, simulate_debt_clearance
+from app.services.allocation_service import run_allocation
+from app.services.debt_amortization import amortize_debts
+from app.services.debt_montecarlo import run_montecarlo
+from app.services.debt_simulator import (
+    collapse_runs,
+    iter_ndjson,
+    page,
+    plan_debt_clearance,
+)
+from app.services.debt_solver import solve_extra_payment
+from app.services.debt_strategy_service import compare_strategies
+from app.services.forecast_service import forecast_balance
 from app.services.savings_planner import calculate_savings_plan
 
 router = APIRouter(prefix="/planner", tags=["Planner"])
@@ -21,57 +45,280 @@ router = APIRouter(prefix="/planner", tags=["Planner"])
     response_model=FinancialSummary,
 )
 def get_financial_summary(
+    date_from: date | None = Query(
+        default=None,
+        alias="from",
+        description="First month to include (day is ignored)",
+    ),
+    date_to: date | None = Query(
+        default=None,
+        alias="to",
+        description="Last month to include (day is ignored)",
+    ),
+    granularity: str | None = Query(
+        default=None,
+        pattern="^(month|quarter|year)$",
+        description="Adds a per-period breakdown; defaults to month when a range is given",
+    ),
     db: Session = Depends(get_db),
     user_id=Depends(get_current_user_id),
 ):
     """
-    Per-user financial summary.
+    Per-user financial summary, optionally limited to a range of months
+    with a month-by-month (or quarterly / yearly) breakdown.
     """
-    return calculate_financial_summary(db, user_id=user_id)
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'",
+        )
+    return planner_cache.cached(
+        "summary",
+        user_id,
+        (date_from, date_to, granularity),
+        lambda: calculate_financial_summary(
+            db,
+            user_id=user_id,
+            date_from=date_from,
+            date_to=date_to,
+            granularity=granularity,
+        ),
+    )
 
 
 @router.get(
     "/debt-plan",
     response_model=DebtPlanResponse,
+    response_model_exclude_none=True,
 )
 def get_debt_plan(
     reserved_cash: float = Query(0, ge=0),
+    output: str = Query(
+        "summary",
+        pattern="^(summary|full|rle|stream)$",
+        description=(
+            "summary: payoff month per debt; full: plus every month; "
+            "rle: plus runs of identical months; stream: NDJSON months"
+        ),
+    ),
+    offset: int = Query(0, ge=0, description="Months (or runs) to skip"),
+    limit: int | None = Query(None, ge=1, description="Months (or runs) to return"),
+    model: str = Query(
+        "simple",
+        pattern="^(simple|amortized)$",
+        description="'amortized' accrues interest at each debt's APR",
+    ),
     db: Session = Depends(get_db),
     user_id=Depends(get_current_user_id),
 ):
     """
-    Run per-user debt clearance simulation.
+    Run per-user debt clearance simulation: the month each debt is
+    cleared, optionally with the monthly payments in full, run-length
+    encoded or streamed as NDJSON. The amortized model adds interest and
+    the interest/principal split.
     """
-    summary = calculate_financial_summary(db, user_id=user_id)
+    def compute(include_breakdown: bool):
+        summary = calculate_financial_summary(db, user_id=user_id)
 
-    free_cash = summary["free_cash"]
-    usable_cash = max(free_cash - reserved_cash, 0)
+        free_cash = summary["free_cash"]
+        usable_cash = max(free_cash - reserved_cash, 0)
+
+        engine = amortize_debts if model == "amortized" else plan_debt_clearance
+        return engine(
+            monthly_income=summary["total_income"],
+            living_expenses=summary["living_expenses"],
+            debts=load_debt_items(db, user_id),
+            include_breakdown=include_breakdown,
+        )
+
+    if output == "summary":
+        plan = planner_cache.cached(
+            "debt-plan", user_id, (reserved_cash, model), lambda: compute(False)
+        )
+    else:
+        plan = compute(True)
+
+    if "error" in plan:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=plan["error"],
+        )
+    if output == "summary":
+        return plan
+
+    # Months are generated lazily; only the requested page is materialized
+    months = plan.pop("monthly_breakdown")
+    if output == "stream":
+        return StreamingResponse(
+            iter_ndjson(plan, page(months, offset, limit)),
+            media_type="application/x-ndjson",
+        )
+    if output == "rle":
+        plan["monthly_runs"] = list(page(collapse_runs(months), offset, limit))
+    else:
+        plan["monthly_breakdown"] = list(page(months, offset, limit))
+    return plan
+
+
+@router.get(
+    "/debt-plan/montecarlo",
+    response_model=MonteCarloPlan,
+)
+def get_debt_plan_montecarlo(
+    paths: int = Query(10_000, ge=1, le=100_000),
+    horizon_months: int = Query(360, ge=1, le=1200),
+    history_months: int = Query(24, ge=1, le=120, description="Past months to sample from"),
+    target_date: date | None = Query(default=None),
+    seed: int | None = Query(default=None, description="Fix for reproducible results"),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Debt-free date percentiles when future months' income and expenses
+    are resampled from the user's history, with the probability of being
+    debt-free by `target_date`.
+    """
+    try:
+        return run_montecarlo(
+            db,
+            user_id=user_id,
+            paths=paths,
+            horizon_months=horizon_months,
+            history_months=history_months,
+            target_date=target_date,
+            seed=seed,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
 
-    debts = (
-        db.query(models.Debt)
-        .filter(models.Debt.user_id == user_id)
-        .all()
-    )
 
-    debt_items: list[DebtItem] = []
-    for d in debts:
-        debt_items.append(
-            DebtItem(
-                name=d.creditor_name,
-                remaining=float(d.remaining_amount),
-                # Only non-flexible debts are treated as fixed EMI
-                emi=float(d.emi_amount)
-                if d.emi_amount is not None and not d.is_flexible
-                else None,
-                is_flexible=d.is_flexible,
-                priority=d.priority,
-            )
+@router.get(
+    "/debt-solve",
+    response_model=DebtSolveResponse,
+    response_model_exclude_none=True,
+)
+def solve_debt_plan(
+    target_date: date = Query(..., description="Be debt-free by this date's month"),
+    model: str = Query("simple", pattern="^(simple|amortized)$"),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Minimum extra monthly payment that clears every debt by
+    `target_date` (month 1 is next month).
+    """
+    today = date.today()
+    months = (target_date.year - today.year) * 12 + target_date.month - today.month
+    if months < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="target_date must be in a future month",
         )
 
-    return simulate_debt_clearance(
+    summary = calculate_financial_summary(db, user_id=user_id)
+    result = solve_extra_payment(
         monthly_income=summary["total_income"],
         living_expenses=summary["living_expenses"],
-        debts=debt_items,
+        debts=load_debt_items(db, user_id),
+        months=months,
+        model=model,
+    )
+    return {"target_date": target_date, "months": months, "model": model, **result}
+
+
+@router.get(
+    "/allocate",
+    response_model=AllocationPlan,
+    response_model_exclude_none=True,
+)
+def get_allocation(
+    output: str = Query(
+        "full",
+        pattern="^(full|runs)$",
+        description="full: every month; runs: stretches with the same split",
+    ),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Month-by-month split of free cash between flexible debts and savings
+    goals: deadline goals kept on schedule, the rest by highest interest
+    rate avoided or earned.
+    """
+    today = date.today()
+    return planner_cache.cached(
+        "allocate",
+        user_id,
+        (today, output),
+        lambda: run_allocation(db, user_id, output=output, today=today),
+    )
+
+
+@router.get(
+    "/debt-strategies",
+    response_model=DebtStrategiesResponse,
+    response_model_exclude_none=True,
+)
+def get_debt_strategies(
+    order: list[UUID] | None = Query(
+        default=None,
+        description="Debt ids in the order to pay them (adds the 'custom' strategy)",
+    ),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Compare payoff orderings (stored priority, avalanche, snowball and an
+    optional custom order) with the amortized model.
+    """
+    summary = calculate_financial_summary(db, user_id=user_id)
+    try:
+        result = compare_strategies(
+            monthly_income=summary["total_income"],
+            living_expenses=summary["living_expenses"],
+            debts=load_debt_items(db, user_id),
+            custom_order=order,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    if "error" in result:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=result["error"],
+        )
+    return result
+
+
+@router.get(
+    "/forecast",
+    response_model=BalanceForecast,
+)
+def get_balance_forecast(
+    months: int = Query(12, ge=1, le=360),
+    granularity: str = Query("monthly", pattern="^(daily|monthly)$"),
+    starting_balance: float | None = Query(
+        default=None,
+        description="Defaults to income minus expenses recorded so far",
+    ),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Project the balance forward from active recurring transactions and
+    fixed debt EMIs, per day or per month.
+    """
+    return forecast_balance(
+        db,
+        user_id=user_id,
+        months=months,
+        granularity=granularity,
+        starting_balance=starting_balance,
     )
 
 
@@ -85,15 +332,18 @@ def get_savings_plan(
     Per-user savings planner using:
     monthly_saving_power = free_cash + total EMI.
     """
-    summary = calculate_financial_summary(db, user_id=user_id)
-    free_cash = summary["free_cash"]
+    def compute():
+        summary = calculate_financial_summary(db, user_id=user_id)
+        free_cash = summary["free_cash"]
 
-    return calculate_savings_plan(
-        db=db,
-        user_id=user_id,
-        free_cash=free_cash,
-        target_amount=target_amount,
-    )
+        return calculate_savings_plan(
+            db=db,
+            user_id=user_id,
+            free_cash=free_cash,
+            target_amount=target_amount,
+        )
+
+    return planner_cache.cached("savings-plan", user_id, target_amount, compute)
 
 
 @router.get("/overview")
@@ -104,4 +354,9 @@ def planner_overview(
     """
     Combined summary + debt plan for a single user.
     """
-    return run_financial_planner(db, user_id=user_id)
+    return planner_cache.cached(
+        "overview",
+        user_id,
+        None,
+        lambda: run_financial_planner(db, user_id=user_id),
+    )
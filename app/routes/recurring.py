@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.dependencies import get_current_user_id
+from app.idempotency import IdempotentRoute
 from app.schemas.recurring import (
     RecurringCreate,
     RecurringUpdate,
@@ -14,7 +15,11 @@ from app.schemas.recurring import (
 from app.services import recurring_service
 
 
-router = APIRouter(prefix="/recurring", tags=["Recurring Transactions"])
+router = APIRouter(
+    prefix="/recurring",
+    tags=["Recurring Transactions"],
+    route_class=IdempotentRoute,
+)
 
 
 @router.get(
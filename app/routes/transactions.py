@@ -1,13 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import Any
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.db import models
-from app.schemas.transaction import TransactionCreate, TransactionResponse
+from app.schemas.transaction import (
+    TransactionBulkResponse,
+    TransactionCreate,
+    TransactionImportResponse,
+    TransactionResponse,
+)
 from app.dependencies import get_current_user_id
+from app.idempotency import IdempotentRoute
+from app.services import export_service, import_service, transaction_service
+from app.services.transaction_service import TransactionFilters
+
+router = APIRouter(
+    prefix="/transactions",
+    tags=["Transactions"],
+    route_class=IdempotentRoute,
+)
+
 
-router = APIRouter(prefix="/transactions", tags=["Transactions"])
+def get_transaction_filters(
+    date_from: date | None = Query(default=None, description="Inclusive start date"),
+    date_to: date | None = Query(default=None, description="Inclusive end date"),
+    type: str | None = Query(default=None, examples=["Income", "Expense"]),
+    category: str | None = None,
+    payment_mode: str | None = None,
+    wallet_id: UUID | None = None,
+) -> TransactionFilters:
+    return TransactionFilters(
+        date_from=date_from,
+        date_to=date_to,
+        type=type,
+        category=category,
+        payment_mode=payment_mode,
+        wallet_id=wallet_id,
+    )
 
 
 @router.get(
@@ -16,16 +59,73 @@ router = APIRouter(prefix="/transactions", tags=["Transactions"])
     status_code=status.HTTP_200_OK,
 )
 def get_transactions(
+    response: Response,
+    filters: TransactionFilters = Depends(get_transaction_filters),
+    cursor: str | None = Query(
+        default=None,
+        description="Opaque cursor from the previous page's X-Next-Cursor header",
+    ),
+    limit: int = Query(
+        default=transaction_service.DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=transaction_service.MAX_PAGE_SIZE,
+    ),
     db: Session = Depends(get_db),
     user_id=Depends(get_current_user_id),
 ):
     """
-    List transactions for the current user only.
+    List transactions for the current user only, newest first.
+
+    Results are keyset-paginated on (date, id); when more rows exist the
+    cursor for the next page is returned in the `X-Next-Cursor` header.
+    """
+    try:
+        items, next_cursor = transaction_service.list_transactions(
+            db,
+            user_id,
+            filters,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+def export_transactions(
+    format: str = Query(default="csv", pattern="^(csv|ndjson|parquet)$"),
+    filters: TransactionFilters = Depends(get_transaction_filters),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Stream the current user's transactions as CSV, NDJSON or Parquet.
+
+    Rows are read through a server-side cursor and written out chunk by
+    chunk, so memory use does not grow with the number of transactions.
     """
-    return (
-        db.query(models.Transaction)
-        .filter(models.Transaction.user_id == user_id)
-        .all()
+    if format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export requires pyarrow to be installed",
+        )
+
+    return StreamingResponse(
+        export_service.stream_transactions(user_id, filters, format),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{format}"',
+        },
     )
 
 
@@ -42,14 +142,7 @@ def get_transaction_by_id(
     """
     Get a single transaction, ensuring it belongs to the current user.
     """
-    transaction = (
-        db.query(models.Transaction)
-        .filter(
-            models.Transaction.id == transaction_id,
-            models.Transaction.user_id == user_id,
-        )
-        .first()
-    )
+    transaction = transaction_service.get_transaction(db, user_id, transaction_id)
     if not transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -71,20 +164,93 @@ def create_transaction(
     """
     Create a transaction for the current user.
     """
-    transaction = models.Transaction(
-        user_id=user_id,
-        date=payload.date,
-        type=payload.type,
-        category=payload.category,
-        amount=payload.amount,
-        payment_mode=payload.payment_mode,
+    try:
+        return transaction_service.create_transaction(db, user_id, payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+
+@router.post(
+    "/bulk",
+    response_model=TransactionBulkResponse,
+    status_code=status.HTTP_200_OK,
+)
+def bulk_create_transactions(
+    items: list[Any] = Body(
+        ...,
+        max_length=transaction_service.MAX_BULK_ITEMS,
+        description="Array of TransactionCreate objects",
+    ),
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Create many transactions for the current user in one DB transaction.
+
+    Each item is validated on its own; invalid items are reported in
+    `results` and do not prevent the valid ones from being written.
+    """
+    results = transaction_service.bulk_create_transactions(db, user_id, items)
+    created = sum(1 for r in results if r.status == "created")
+    return TransactionBulkResponse(
+        created=created,
+        failed=len(results) - created,
+        results=results,
     )
 
-    db.add(transaction)
-    db.commit()
-    db.refresh(transaction)
 
-    return transaction
+@router.post(
+    "/import",
+    response_model=TransactionImportResponse,
+    status_code=status.HTTP_200_OK,
+)
+def import_transactions(
+    file: UploadFile = File(..., description="Bank statement (CSV, OFX/QFX or QIF)"),
+    format: str | None = Query(
+        default=None,
+        pattern="^(csv|ofx|qif)$",
+        description="Defaults to the uploaded file's extension",
+    ),
+    date_format: str | None = Query(
+        default=None,
+        description="strptime format for CSV/QIF dates (default %Y-%m-%d / %m/%d/%Y)",
+    ),
+    default_category: str = Query(default="Uncategorized"),
+    wallet_id: UUID | None = None,
+    db: Session = Depends(get_db),
+    user_id=Depends(get_current_user_id),
+):
+    """
+    Import a bank statement for the current user.
+
+    Rows already imported (same date, amount, category and payment mode)
+    are skipped, so overlapping statements can be re-uploaded safely.
+    """
+    fmt = format or import_service.detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not infer file format; pass ?format=csv|ofx|qif",
+        )
+
+    try:
+        return import_service.import_transactions(
+            db,
+            user_id,
+            file.file,
+            fmt,
+            date_format=date_format,
+            default_category=default_category,
+            wallet_id=wallet_id,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
 
 
 @router.put(
@@ -101,30 +267,20 @@ def update_transaction(
     """
     Update a transaction owned by the current user.
     """
-    transaction = (
-        db.query(models.Transaction)
-        .filter(
-            models.Transaction.id == transaction_id,
-            models.Transaction.user_id == user_id,
+    try:
+        transaction = transaction_service.update_transaction(
+            db, user_id, transaction_id, payload
         )
-        .first()
-    )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
     if not transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found",
         )
-
-    transaction.date = payload.date
-    transaction.type = payload.type
-    transaction.category = payload.category
-    transaction.amount = payload.amount
-    transaction.payment_mode = payload.payment_mode
-
-    db.add(transaction)
-    db.commit()
-    db.refresh(transaction)
-
     return transaction
 
 
@@ -140,20 +296,9 @@ def delete_transaction(
     """
     Delete a transaction owned by the current user.
     """
-    transaction = (
-        db.query(models.Transaction)
-        .filter(
-            models.Transaction.id == transaction_id,
-            models.Transaction.user_id == user_id,
-        )
-        .first()
-    )
-    if not transaction:
+    ok = transaction_service.delete_transaction(db, user_id, transaction_id)
+    if not ok:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found",
         )
-
-    db.delete(transaction)
-    db.commit()
-
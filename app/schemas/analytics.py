@@ -0,0 +1,40 @@
+from datetime import date, datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class TrendSeries(BaseModel):
+    category: str
+    values: List[float]
+    moving_average: List[float]
+    delta: List[Optional[float]]
+    delta_percent: List[Optional[float]]
+
+
+class TrendsResponse(BaseModel):
+    granularity: str
+    window: int
+    date_from: date
+    date_to: date
+    periods: List[str]
+    period_starts: List[date]
+    series: List[TrendSeries]
+    total: TrendSeries
+
+
+class AnomalyResponse(BaseModel):
+    id: UUID
+    transaction_id: UUID
+    date: date
+    category: str
+    amount: float
+    median: float
+    mad: float
+    score: float
+    history_size: int
+    detected_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -54,3 +54,21 @@ class BudgetSummary(BaseModel):
     total_spent: Decimal
     total_remaining: Decimal
 
+
+
+class BudgetReportMonth(BaseModel):
+    month: int
+    budget_id: UUID
+    name: str
+    categories: List[BudgetCategorySummary]
+    total_limit: Decimal
+    total_spent: Decimal
+    total_remaining: Decimal
+
+
+class BudgetReport(BaseModel):
+    year: int
+    months: List[BudgetReportMonth]
+    total_limit: Decimal
+    total_spent: Decimal
+    total_remaining: Decimal
@@ -44,6 +44,7 @@ class DebtResponse(DebtBase):
     is_flexible: bool
     priority: int
     status: str
+    version: int
     created_at: datetime
 
     class Config:
@@ -0,0 +1,42 @@
+from uuid import UUID
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List
+from pydantic import BaseModel, Field
+
+
+# -------------------------
+# Create Schema (POST)
+# -------------------------
+class PaymentCreate(BaseModel):
+    amount_paid: Decimal = Field(..., gt=0, max_digits=12, decimal_places=2)
+    payment_date: date | None = None   # defaults to today
+    payment_mode: str | None = Field(default=None, max_length=50)
+    note: str | None = Field(default=None, max_length=255)
+    wallet_id: UUID | None = None
+
+
+# -------------------------
+# Response Schemas
+# -------------------------
+class PaymentResponse(BaseModel):
+    id: UUID
+    user_id: UUID
+    debt_id: UUID
+    wallet_id: UUID | None
+    amount_paid: Decimal
+    payment_date: date
+    payment_mode: str | None
+    note: str | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PaymentReceipt(BaseModel):
+    debt_id: UUID
+    remaining_amount: Decimal
+    status: str
+    version: int
+    payments: List[PaymentResponse]
@@ -1,10 +1,15 @@
+from datetime import date
+from uuid import UUID
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class PaymentItem(BaseModel):
     debt: str
     amount: float
+    # Split of `amount`; amortized model only
+    interest: Optional[float] = None
+    principal: Optional[float] = None
 
 
 class MonthlyPlan(BaseModel):
@@ -12,9 +17,132 @@ class MonthlyPlan(BaseModel):
     payments: List[PaymentItem]
 
 
+class MonthlyRun(BaseModel):
+    from_month: int
+    to_month: int
+    # Monthly amounts; interest/principal are totals over the run
+    payments: List[PaymentItem]
+
+
+class DebtPayoff(BaseModel):
+    debt: str
+    payoff_month: Optional[int]
+    remaining: float
+    # Amortized model only
+    interest_paid: Optional[float] = None
+    principal_paid: Optional[float] = None
+
+
 class DebtPlanResponse(BaseModel):
-    total_months: int
-    monthly_breakdown: List[MonthlyPlan]
+    total_months: Optional[int]
+    free_cash: float
+    total_interest: Optional[float] = None
+    timeline: List[DebtPayoff]
+    monthly_breakdown: Optional[List[MonthlyPlan]] = None
+    monthly_runs: Optional[List[MonthlyRun]] = None
+
+
+class DebtStrategyResult(BaseModel):
+    strategy: str
+    total_months: Optional[int]
+    total_interest: Optional[float]
+    timeline: List[DebtPayoff]
+
+
+class DebtStrategiesResponse(BaseModel):
+    free_cash: float
+    strategies: List[DebtStrategyResult]
+
+
+class DebtSolveResponse(BaseModel):
+    status: str
+    target_date: date
+    months: int
+    model: str
+    extra_monthly_payment: Optional[float] = None
+    free_cash: Optional[float] = None
+    total_months: Optional[int] = None
+    total_interest: Optional[float] = None
+    probes: int
+    message: Optional[str] = None
+
+
+class AllocationEntry(BaseModel):
+    kind: str   # "debt" or "goal"
+    id: UUID
+    name: str
+    amount: float
+
+
+class AllocationMonth(BaseModel):
+    month: int
+    date: date
+    allocations: List[AllocationEntry]
+    unallocated: float
+
+
+class AllocationRun(BaseModel):
+    from_month: int
+    to_month: int
+    # Monthly amounts
+    allocations: List[AllocationEntry]
+    unallocated: float
+
+
+class AllocationItem(BaseModel):
+    kind: str
+    id: UUID
+    name: str
+    start_balance: float
+    target_amount: Optional[float] = None
+    deadline_month: Optional[int] = None
+    completion_month: Optional[int] = None
+    completion_date: Optional[date] = None
+    on_track: Optional[bool] = None
+    total_allocated: float
+
+
+class AllocationPlan(BaseModel):
+    status: str
+    message: Optional[str] = None
+    free_cash: float
+    total_months: Optional[int] = None
+    items: Optional[List[AllocationItem]] = None
+    months: Optional[List[AllocationMonth]] = None
+    runs: Optional[List[AllocationRun]] = None
+
+
+class MonteCarloPercentile(BaseModel):
+    percentile: int
+    months: Optional[int]
+    date: Optional[date]
+
+
+class MonteCarloDebt(BaseModel):
+    debt: str
+    median_payoff_date: Optional[date]
+    p90_payoff_date: Optional[date]
+    probability_cleared: float
+
+
+class MonteCarloPlan(BaseModel):
+    paths: int
+    horizon_months: int
+    history_months: int
+    target_date: Optional[date] = None
+    probability_debt_free_by_target: Optional[float] = None
+    percentiles: List[MonteCarloPercentile]
+    debts: List[MonteCarloDebt]
+
+
+class PeriodSummary(BaseModel):
+    period: str
+    start_date: date
+    end_date: date
+    total_income: float
+    living_expenses: float
+    mandatory_emi: float
+    free_cash: float
 
 
 class FinancialSummary(BaseModel):
@@ -22,3 +150,23 @@ class FinancialSummary(BaseModel):
     living_expenses: float
     mandatory_emi: float
     free_cash: float
+    periods: Optional[List[PeriodSummary]] = None
+
+
+class ForecastPoint(BaseModel):
+    date: date
+    income: float
+    expenses: float
+    emi: float
+    balance: float
+
+
+class BalanceForecast(BaseModel):
+    start_date: date
+    end_date: date
+    granularity: str
+    starting_balance: float
+    ending_balance: float
+    lowest_balance: float
+    lowest_balance_date: date
+    points: List[ForecastPoint]
@@ -0,0 +1,71 @@
+from uuid import UUID
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+# -------------------------
+# Base Schema
+# -------------------------
+class SavingsGoalBase(BaseModel):
+    name: str = Field(..., max_length=255)
+    target_amount: Decimal = Field(..., gt=0)
+    current_amount: Decimal = Field(default=Decimal("0"), ge=0)
+
+    contribution_amount: Decimal = Field(default=Decimal("0"), ge=0)
+    contribution_frequency: str = Field(
+        default="monthly",
+        pattern="^(weekly|monthly|quarterly|yearly)$",
+    )
+    end_date: date | None = None
+
+    annual_interest_rate: Decimal | None = Field(
+        default=None,
+        ge=0,
+        lt=1000,
+        description="Percent per year, compounded monthly",
+    )
+    target_date: date | None = None
+    wallet_id: UUID | None = None
+
+
+# -------------------------
+# Create Schema (POST/PUT)
+# -------------------------
+class SavingsGoalCreate(SavingsGoalBase):
+    start_date: date | None = None   # first contribution; defaults to today
+
+
+# -------------------------
+# Response Schemas
+# -------------------------
+class SavingsGoalResponse(SavingsGoalBase):
+    id: UUID
+    user_id: UUID
+    start_date: date
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class GoalProjection(BaseModel):
+    goal_id: UUID
+    name: str
+    target_amount: float
+    current_amount: float
+    target_date: Optional[date] = None
+    months_to_target: Optional[int] = None
+    projected_completion_date: Optional[date] = None
+    balance_at_target_date: Optional[float] = None
+    on_track: Optional[bool] = None
+    shortfall: Optional[float] = None
+    additional_monthly_contribution: Optional[float] = None
+    projection: Optional[List[float]] = None
+
+
+class GoalsOverview(BaseModel):
+    as_of: date
+    horizon_months: int
+    goals: List[GoalProjection]
@@ -12,6 +12,7 @@ class TransactionBase(BaseModel):
     category: str
     amount: float
     payment_mode: str | None = None
+    wallet_id: UUID | None = None
 
 
 # -------------------------
@@ -23,6 +24,7 @@ class TransactionCreate(TransactionBase):
     category: str
     amount: float
     payment_mode: str | None = None
+    wallet_id: UUID | None = None
 
 
 # -------------------------
@@ -36,7 +38,41 @@ class TransactionResponse(TransactionBase):
     category: str
     amount: float
     payment_mode: str | None
+    wallet_id: UUID | None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+# -------------------------
+# Bulk ingest Schemas
+# -------------------------
+class TransactionBulkItemResult(BaseModel):
+    index: int
+    status: str = Field(..., examples=["created", "invalid"])
+    id: UUID | None = None
+    errors: list[dict] | None = None
+
+
+class TransactionBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[TransactionBulkItemResult]
+
+
+# -------------------------
+# Statement import Schemas
+# -------------------------
+class TransactionImportError(BaseModel):
+    record: int
+    message: str
+
+
+class TransactionImportResponse(BaseModel):
+    format: str
+    processed: int
+    imported: int
+    duplicates: int
+    failed: int
+    errors: list[TransactionImportError]
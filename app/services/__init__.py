@@ -1,2 +1,9 @@
-from . import budget_service, recurring_service, wallet_service  # noqa: F401
+from . import (  # noqa: F401
+    analytics_service,
+    budget_service,
+    recurring_service,
+    rollup_service,
+    transaction_service,
+    wallet_service,
+)
 
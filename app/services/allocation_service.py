@@ -0,0 +1,387 @@
+import math
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import SavingsGoal
+from app.services.debt_simulator import DebtItem
+from app.services.planner_service import calculate_financial_summary, load_debt_items
+
+
+MAX_ALLOCATION_MONTHS = 600
+
+# Balances within half a cent of done count as done
+_EPSILON = 0.005
+
+
+class _Item:
+    """
+    One thing competing for free cash: a flexible debt (balance falls) or
+    a savings goal (balance rises towards `target`).
+    """
+
+    __slots__ = (
+        "kind",
+        "id",
+        "name",
+        "balance",
+        "rate",
+        "target",
+        "deadline",
+        "priority",
+        "done_month",
+        "allocated",
+        "start_balance",
+        "position",
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        id: UUID,
+        name: str,
+        balance: float,
+        annual_rate: float,
+        target: Optional[float] = None,
+        deadline: Optional[int] = None,
+        priority: int = 0,
+    ):
+        self.kind = kind
+        self.id = id
+        self.name = name
+        self.balance = balance
+        self.start_balance = balance
+        self.rate = (annual_rate or 0.0) / 1200
+        self.target = target
+        self.deadline = deadline
+        self.priority = priority
+        self.allocated = 0.0
+        # Already paid off / reached counts as done in month 0
+        self.done_month = None if self.is_open() else 0
+        self.position = 0
+
+    @property
+    def is_debt(self) -> bool:
+        return self.kind == "debt"
+
+    def is_open(self) -> bool:
+        if self.is_debt:
+            return self.balance > _EPSILON
+        return self.balance < self.target - _EPSILON
+
+    def need(self) -> float:
+        """Cash that finishes this item this month."""
+        grown = self.balance * (1 + self.rate)
+        return grown if self.is_debt else self.target - grown
+
+    def required(self, month: int) -> float:
+        """
+        Level monthly contribution that reaches the target by the end of
+        the deadline month, from this month on.
+        """
+        n = self.deadline - month + 1
+        g = self.rate
+        if g == 0:
+            return (self.target - self.balance) / n
+        growth = (1 + g) ** n
+        return (self.target - self.balance * growth) * g / (growth - 1)
+
+    def months_to_finish(self, amount: float) -> float:
+        """
+        Months until this item is done with `amount` every month (the
+        last of them included), or inf if it never is.
+        """
+        r = self.rate
+        if self.is_debt:
+            # B(1+r)^n - a((1+r)^n - 1)/r <= 0
+            if r == 0:
+                return math.ceil(self.balance / amount - 1e-9) if amount > 0 else math.inf
+            if amount <= self.balance * r:
+                return math.inf
+            n = math.log(amount / (amount - self.balance * r)) / math.log1p(r)
+        else:
+            # B(1+g)^n + a((1+g)^n - 1)/g >= T
+            if r == 0:
+                gap = self.target - self.balance
+                return math.ceil(gap / amount - 1e-9) if amount > 0 else math.inf
+            start = self.balance * r + amount
+            if start <= 0:
+                return math.inf
+            n = math.log((self.target * r + amount) / start) / math.log1p(r)
+        return max(math.ceil(n - 1e-9), 1)
+
+    def advance(self, amount: float, months: int) -> None:
+        """Apply `amount` at the end of each of `months` months."""
+        r = self.rate
+        growth = (1 + r) ** months
+        annuity = (growth - 1) / r if r else months
+        sign = -1 if self.is_debt else 1
+        self.balance = self.balance * growth + sign * amount * annuity
+        self.allocated += amount * months
+
+
+def _allocate_month(
+    items: Sequence[_Item],
+    by_deadline: Sequence[_Item],
+    by_value: Sequence[_Item],
+    cash: float,
+    month: int,
+) -> Tuple[List[float], float]:
+    """
+    One month of the greedy split.
+
+    Goals with a deadline first get the level contribution that keeps
+    them on schedule, earliest deadline first. What is left goes, in
+    order of marginal value (monthly interest avoided or earned), to
+    each open item up to what finishes it this month.
+    """
+    amounts = [0.0] * len(items)
+
+    for item in by_deadline:
+        if cash <= 0:
+            break
+        if item.deadline < month or not item.is_open():
+            continue
+        give = min(max(item.required(month), 0.0), item.need(), cash)
+        amounts[item.position] += give
+        cash -= give
+
+    for item in by_value:
+        if cash <= 0:
+            break
+        if not item.is_open():
+            continue
+        give = min(item.need() - amounts[item.position], cash)
+        if give > 0:
+            amounts[item.position] += give
+            cash -= give
+
+    return amounts, max(cash, 0.0)
+
+
+def allocate(
+    free_cash: float,
+    debts: List[DebtItem],
+    goals: Sequence,
+    today: date,
+    horizon_months: int = MAX_ALLOCATION_MONTHS,
+) -> Dict:
+    """
+    Split a constant monthly surplus between flexible debts and savings
+    goals, month by month, greedily by marginal value.
+
+    Month 1 is next month. Each month every balance first accrues its
+    monthly interest (debts grow, goals earn), then receives its share.
+    Deadline goals are kept on schedule first; everything else goes to
+    the open item with the highest monthly rate (ties: debts before
+    goals, then by priority), spilling to the next once an item is
+    finished. Fixed-EMI debts pay their EMI outside this split, and
+    goals' own contribution schedules are ignored: the surplus is what
+    is being allocated. A goal's deadline is the month of its
+    target_date.
+
+    Between events (an item finishing, a deadline month, the horizon)
+    the split is the same every month, so the solver jumps over each
+    such run in closed form (the annuity formulas) and only steps
+    through event months one by one. A solve costs O(events × items),
+    independent of how many months the plan spans.
+
+    Returns (total_months, items, runs), where each run is
+    (first_month, last_month, amounts per item, unallocated). total_months
+    is None if something is still open at the horizon.
+    """
+    current = today.year * 12 + today.month - 1
+    items: List[_Item] = [
+        _Item(
+            "debt",
+            d.debt_id,
+            d.name,
+            d.remaining,
+            d.interest_rate,
+            priority=d.priority,
+        )
+        for d in debts
+        if d.emi is None and d.is_flexible and d.remaining > 0
+    ]
+    items += [
+        _Item(
+            "goal",
+            g.id,
+            g.name,
+            float(g.current_amount or 0),
+            float(g.annual_interest_rate or 0),
+            target=float(g.target_amount),
+            deadline=(
+                None
+                if g.target_date is None
+                else g.target_date.year * 12 + g.target_date.month - 1 - current
+            ),
+        )
+        for g in goals
+    ]
+    for position, item in enumerate(items):
+        item.position = position
+
+    by_deadline = sorted(
+        (item for item in items if item.deadline is not None),
+        key=lambda item: item.deadline,
+    )
+    by_value = sorted(
+        items,
+        key=lambda item: (-item.rate, not item.is_debt, item.priority),
+    )
+
+    runs: List[Tuple[int, int, List[float], float]] = []
+    month = 1
+    while month <= horizon_months and any(item.is_open() for item in items):
+        amounts, unallocated = _allocate_month(
+            items, by_deadline, by_value, free_cash, month
+        )
+
+        # Longest stretch this exact split can repeat: up to the month
+        # before any item would finish, through the next deadline month
+        months = horizon_months - month + 1
+        for item, amount in zip(items, amounts):
+            if not item.is_open():
+                continue
+            months = min(months, item.months_to_finish(amount) - 1)
+            if item.deadline is not None and item.deadline >= month:
+                months = min(months, item.deadline - month + 1)
+        months = max(months, 1)
+
+        for item, amount in zip(items, amounts):
+            if item.is_open():
+                item.advance(amount, months)
+                if not item.is_open():
+                    item.done_month = month + months - 1
+        runs.append((month, month + months - 1, amounts, unallocated))
+        month += months
+
+    total_months = None
+    if not any(item.is_open() for item in items):
+        total_months = max((item.done_month or 0 for item in items), default=0)
+    return {"total_months": total_months, "items": items, "runs": runs}
+
+
+def _month_date(today: date, months: int) -> date:
+    """First day of the month `months` after today's month."""
+    year, month0 = divmod(today.year * 12 + today.month - 1 + months, 12)
+    return date(year, month0 + 1, 1)
+
+
+def _entries(items: Sequence[_Item], amounts: Sequence[float]) -> List[Dict]:
+    return [
+        {
+            "kind": item.kind,
+            "id": item.id,
+            "name": item.name,
+            "amount": round(amount, 2),
+        }
+        for item, amount in zip(items, amounts)
+        if round(amount, 2) > 0
+    ]
+
+
+def iter_months(plan: Dict, today: date) -> Iterator[Dict]:
+    """The runs of a plan expanded into one entry per month."""
+    for first, last, amounts, unallocated in plan["runs"]:
+        entries = _entries(plan["items"], amounts)
+        for month in range(first, last + 1):
+            yield {
+                "month": month,
+                "date": _month_date(today, month),
+                "allocations": entries,
+                "unallocated": round(unallocated, 2),
+            }
+
+
+def run_allocation(
+    db: Session,
+    user_id: UUID,
+    output: str = "full",
+    horizon_months: int = MAX_ALLOCATION_MONTHS,
+    today: Optional[date] = None,
+) -> Dict:
+    """
+    Load the user's surplus, flexible debts and savings goals and return
+    the allocation plan (`output` "full" lists every month, "runs" only
+    the stretches where the split stays the same).
+    """
+    if today is None:
+        today = date.today()
+
+    summary = calculate_financial_summary(db, user_id=user_id)
+    debts = load_debt_items(db, user_id)
+    free_cash = (
+        summary["total_income"]
+        - summary["living_expenses"]
+        - sum(d.emi or 0 for d in debts)
+    )
+    if free_cash <= 0:
+        return {
+            "status": "not_possible",
+            "message": "No free cash to allocate",
+            "free_cash": round(free_cash, 2),
+        }
+
+    goals = db.execute(
+        select(
+            SavingsGoal.id,
+            SavingsGoal.name,
+            SavingsGoal.current_amount,
+            SavingsGoal.target_amount,
+            SavingsGoal.annual_interest_rate,
+            SavingsGoal.target_date,
+        )
+        .where(SavingsGoal.user_id == user_id)
+        .order_by(SavingsGoal.created_at, SavingsGoal.id)
+    ).all()
+
+    plan = allocate(free_cash, debts, goals, today, horizon_months)
+    items = plan["items"]
+
+    result = {
+        "status": "possible" if plan["total_months"] is not None else "incomplete",
+        "free_cash": round(free_cash, 2),
+        "total_months": plan["total_months"],
+        "items": [
+            {
+                "kind": item.kind,
+                "id": item.id,
+                "name": item.name,
+                "start_balance": round(item.start_balance, 2),
+                "target_amount": None if item.is_debt else round(item.target, 2),
+                "deadline_month": item.deadline,
+                "completion_month": item.done_month,
+                "completion_date": (
+                    None
+                    if item.done_month is None
+                    else _month_date(today, item.done_month)
+                ),
+                "on_track": (
+                    None
+                    if item.deadline is None
+                    else item.done_month is not None
+                    and item.done_month <= item.deadline
+                ),
+                "total_allocated": round(item.allocated, 2),
+            }
+            for item in items
+        ],
+    }
+    if output == "runs":
+        result["runs"] = [
+            {
+                "from_month": first,
+                "to_month": last,
+                "allocations": _entries(items, amounts),
+                "unallocated": round(unallocated, 2),
+            }
+            for first, last, amounts, unallocated in plan["runs"]
+        ]
+    else:
+        result["months"] = list(iter_months(plan, today))
+    return result
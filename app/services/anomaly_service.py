@@ -0,0 +1,285 @@
+from datetime import date, timedelta
+from typing import Callable, List
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Float, Integer, column, func, select, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Anomaly, Transaction
+from app.db.session import SessionLocal
+
+
+# Iglewicz & Hoaglin's cut-off for the modified z-score
+DEFAULT_THRESHOLD = 3.5
+DEFAULT_HISTORY_DAYS = 365
+DEFAULT_MIN_HISTORY = 8
+
+# MAD and mean absolute deviation -> standard deviation (normal data)
+_MAD_SCALE = 1.4826
+_MEANAD_SCALE = 1.2533
+
+CHUNK_ROWS = 200_000
+INSERT_BATCH_SIZE = 5_000
+
+EPOCH = date(1970, 1, 1)
+
+# One fixed-width row of the binary COPY below: a field count, then
+# (length, value) per column, all big-endian
+_COPY_ROW = np.dtype(
+    [
+        ("fields", ">i2"),
+        ("group_len", ">i4"), ("group", ">i8"),
+        ("id_len", ">i4"), ("id", "V16"),
+        ("date_len", ">i4"), ("date", ">i4"),
+        ("amount_len", ">i4"), ("amount", ">f8"),
+    ]
+)
+_COPY_HEADER = 19
+_COPY_TRAILER = 2
+
+# Rows come out grouped by (user, category) and sorted by amount within
+# each group; dense_rank numbers the groups so no text crosses the wire
+_COPY_SQL = """
+COPY (
+    SELECT
+        dense_rank() OVER (ORDER BY user_id, category)::int8,
+        id,
+        (date - DATE '1970-01-01')::int4,
+        amount::float8
+    FROM transactions
+    WHERE type = 'Expense' AND date >= %(history_from)s
+    ORDER BY user_id, category, amount
+) TO STDOUT WITH (FORMAT binary)
+"""
+
+
+def score_chunk(
+    rows: np.ndarray,
+    recent_from: int,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_history: int = DEFAULT_MIN_HISTORY,
+) -> List[tuple]:
+    """
+    Score complete (user, category) groups and return the recent outliers
+    as (transaction_id, median, mad, score, history_size) tuples.
+
+    `rows` holds group number, id, day and amount, ordered by group and
+    by amount within a group. Everything is computed with array
+    operations: the median is read off each group's middle index, and the
+    absolute deviations are re-sorted within their groups with one
+    lexsort for the MAD. A group whose MAD is zero falls back to the mean
+    absolute deviation; if that is zero as well nothing in it is scored.
+    """
+    n = len(rows)
+    groups = rows["group"]
+    amounts = rows["amount"].astype(np.float64)
+
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = groups[1:] != groups[:-1]
+    starts = np.flatnonzero(new_group)
+    sizes = np.diff(np.append(starts, n))
+    group = np.cumsum(new_group) - 1
+
+    lower = starts + (sizes - 1) // 2
+    upper = starts + sizes // 2
+    median = (amounts[lower] + amounts[upper]) / 2
+
+    deviation = np.abs(amounts - median[group])
+    sorted_deviation = deviation[np.lexsort((deviation, group))]
+    mad = (sorted_deviation[lower] + sorted_deviation[upper]) / 2
+    mean_ad = np.add.reduceat(deviation, starts) / sizes
+
+    scale = np.where(
+        mad > 0,
+        _MAD_SCALE * mad,
+        np.where(mean_ad > 0, _MEANAD_SCALE * mean_ad, np.nan),
+    )
+    with np.errstate(invalid="ignore"):
+        score = (amounts - median[group]) / scale[group]
+        flagged = (
+            (rows["date"] >= recent_from)
+            & (sizes[group] >= min_history)
+            & (np.abs(score) > threshold)
+        )
+
+    return [
+        (
+            UUID(bytes=rows["id"][i].tobytes()),
+            float(median[group[i]]),
+            float(scale[group[i]]),
+            float(score[i]),
+            int(sizes[group[i]]),
+        )
+        for i in np.flatnonzero(flagged)
+    ]
+
+
+def _store(db: Session, anomalies: List[tuple]) -> None:
+    """
+    Upsert anomalies; user, date, category and amount are taken from the
+    transaction itself so they never have to be streamed out.
+    """
+    for start in range(0, len(anomalies), INSERT_BATCH_SIZE):
+        scored = values(
+            column("transaction_id", PG_UUID(as_uuid=True)),
+            column("median", Float),
+            column("mad", Float),
+            column("score", Float),
+            column("history_size", Integer),
+            name="scored",
+        ).data(anomalies[start:start + INSERT_BATCH_SIZE])
+
+        stmt = pg_insert(Anomaly).from_select(
+            [
+                "id",
+                "user_id",
+                "transaction_id",
+                "date",
+                "category",
+                "amount",
+                "median",
+                "mad",
+                "score",
+                "history_size",
+            ],
+            select(
+                func.gen_random_uuid(),
+                Transaction.user_id,
+                Transaction.id,
+                Transaction.date,
+                Transaction.category,
+                Transaction.amount,
+                scored.c.median,
+                scored.c.mad,
+                scored.c.score,
+                scored.c.history_size,
+            ).join(scored, Transaction.id == scored.c.transaction_id),
+        )
+        # Re-scoring a transaction refreshes its figures
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Anomaly.transaction_id],
+            set_={
+                key: stmt.excluded[key]
+                for key in ("median", "mad", "score", "history_size", "detected_at")
+            },
+        )
+        db.execute(stmt)
+
+
+class _GroupChunker:
+    """
+    File-like sink for the binary COPY stream.
+
+    Buffers raw rows and, every `chunk_rows`, scores everything up to the
+    start of the last (possibly incomplete) group, carrying that group
+    over to the next chunk.
+    """
+
+    def __init__(self, score: Callable[[np.ndarray], None], chunk_rows: int):
+        self._score = score
+        self._chunk_bytes = chunk_rows * _COPY_ROW.itemsize
+        self._buffer = bytearray()
+        self._header_left = _COPY_HEADER
+
+    def write(self, data: bytes) -> None:
+        if self._header_left:
+            skipped = min(self._header_left, len(data))
+            data = data[skipped:]
+            self._header_left -= skipped
+        self._buffer += data
+        if len(self._buffer) >= self._chunk_bytes:
+            self._flush(final=False)
+
+    def close(self) -> None:
+        del self._buffer[-_COPY_TRAILER:]
+        self._flush(final=True)
+
+    def _flush(self, final: bool) -> None:
+        count = len(self._buffer) // _COPY_ROW.itemsize
+        if not count:
+            return
+        rows = np.frombuffer(
+            bytes(self._buffer[:count * _COPY_ROW.itemsize]), dtype=_COPY_ROW
+        )
+        cut = count
+        if not final:
+            cut = int(np.searchsorted(rows["group"], rows["group"][-1]))
+            if cut == 0:
+                # One group larger than a chunk; keep reading
+                return
+        self._score(rows[:cut])
+        del self._buffer[:cut * _COPY_ROW.itemsize]
+
+
+def detect_anomalies(
+    db: Session,
+    recent_days: int = 1,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_history: int = DEFAULT_MIN_HISTORY,
+    today: date | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> int:
+    """
+    Nightly job: flag expenses from the last `recent_days` whose robust
+    z-score against the same user's category history (last
+    `history_days`) exceeds `threshold`.
+
+    Runs over the whole user base in one ordered scan, streamed with a
+    binary COPY on a separate connection; each chunk of complete groups
+    is decoded with np.frombuffer, scored in NumPy, and its outliers
+    bulk-upserted and committed. No per-user or per-row queries are
+    issued. Returns the number of anomalies written.
+    """
+    if today is None:
+        today = date.today()
+    recent_from = (today - timedelta(days=recent_days - 1) - EPOCH).days
+    history_from = today - timedelta(days=history_days)
+
+    written = 0
+
+    def score(rows: np.ndarray) -> None:
+        nonlocal written
+        anomalies = score_chunk(rows, recent_from, threshold, min_history)
+        if anomalies:
+            _store(db, anomalies)
+            db.commit()
+            written += len(anomalies)
+
+    sink = _GroupChunker(score, chunk_rows)
+    reader = SessionLocal()
+    try:
+        cursor = reader.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                cursor.mogrify(_COPY_SQL, {"history_from": history_from}).decode(),
+                sink,
+            )
+        finally:
+            cursor.close()
+        sink.close()
+    finally:
+        reader.close()
+    return written
+
+
+def list_anomalies(
+    db: Session,
+    user_id: UUID,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = 100,
+) -> List[Anomaly]:
+    query = db.query(Anomaly).filter(Anomaly.user_id == user_id)
+    if date_from is not None:
+        query = query.filter(Anomaly.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Anomaly.date <= date_to)
+    return (
+        query.order_by(Anomaly.date.desc(), Anomaly.score.desc())
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,192 @@
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    Integer,
+    Numeric,
+    String,
+    column,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.config import BUDGET_ALERT_THRESHOLDS
+from app.db.models import (
+    Budget,
+    BudgetAlertOutbox,
+    BudgetCategory,
+    TransactionMonthlyRollup,
+)
+from app.services.rollup_service import RollupDeltas
+
+
+DRAIN_BATCH_SIZE = 500
+
+
+def apply_spent_deltas(db: Session, deltas: RollupDeltas) -> None:
+    """
+    Move the running `spent` counters of the affected budget categories
+    and queue an alert for every threshold crossed on the way up.
+
+    One statement: an UPDATE ... FROM the expense deltas returns old and
+    new spent per category, and an INSERT ... SELECT over that CTE writes
+    the crossings to the outbox. Runs inside the caller's transaction.
+    """
+    spend: Dict[Tuple[UUID, int, int, str], Decimal] = {}
+    for (user_id, _, year, month, tx_type, category), total, _ in deltas.items():
+        if tx_type != "Expense" or total == 0:
+            continue
+        key = (user_id, year, month, category)
+        spend[key] = spend.get(key, Decimal("0")) + total
+
+    rows = [key + (total,) for key, total in sorted(spend.items()) if total != 0]
+    if not rows:
+        return
+
+    changes = values(
+        column("user_id", PG_UUID(as_uuid=True)),
+        column("year", Integer),
+        column("month", Integer),
+        column("category", String),
+        column("delta", Numeric(14, 2)),
+        name="changes",
+    ).data(rows)
+
+    bump = (
+        update(BudgetCategory)
+        .where(
+            BudgetCategory.budget_id == Budget.id,
+            Budget.user_id == changes.c.user_id,
+            Budget.year == changes.c.year,
+            Budget.month == changes.c.month,
+            BudgetCategory.category == changes.c.category,
+        )
+        .values(spent=BudgetCategory.spent + changes.c.delta)
+    )
+    if not BUDGET_ALERT_THRESHOLDS:
+        db.execute(bump)
+        return
+
+    updated = bump.returning(
+        BudgetCategory.id.label("budget_category_id"),
+        BudgetCategory.budget_id,
+        Budget.user_id,
+        BudgetCategory.category,
+        BudgetCategory.limit_amount,
+        (BudgetCategory.spent - changes.c.delta).label("old_spent"),
+        BudgetCategory.spent.label("new_spent"),
+    ).cte("updated")
+
+    thresholds = values(
+        column("threshold", Integer),
+        name="thresholds",
+    ).data([(t,) for t in BUDGET_ALERT_THRESHOLDS])
+
+    crossed = select(
+        updated.c.user_id,
+        updated.c.budget_id,
+        updated.c.budget_category_id,
+        updated.c.category,
+        thresholds.c.threshold,
+        updated.c.limit_amount,
+        updated.c.new_spent,
+    ).where(
+        updated.c.old_spent * 100 < thresholds.c.threshold * updated.c.limit_amount,
+        updated.c.new_spent * 100 >= thresholds.c.threshold * updated.c.limit_amount,
+    )
+
+    db.execute(
+        insert(BudgetAlertOutbox).from_select(
+            [
+                "user_id",
+                "budget_id",
+                "budget_category_id",
+                "category",
+                "threshold",
+                "limit_amount",
+                "spent",
+            ],
+            crossed,
+        )
+    )
+
+
+def sync_spent(db: Session, budget_ids: Iterable[UUID] | None = None) -> int:
+    """
+    Recompute `spent` from the monthly rollups, for some budgets or all.
+
+    Used when budget categories are (re)created and to repair counters.
+    Does not raise alerts. Returns the number of categories updated.
+    """
+    R = TransactionMonthlyRollup
+    actual = (
+        select(func.coalesce(func.sum(R.total), 0))
+        .where(
+            R.user_id == Budget.user_id,
+            R.type == "Expense",
+            R.year == Budget.year,
+            R.month == Budget.month,
+            R.category == BudgetCategory.category,
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        update(BudgetCategory)
+        .where(BudgetCategory.budget_id == Budget.id)
+        .values(spent=actual)
+    )
+    if budget_ids is not None:
+        stmt = stmt.where(Budget.id.in_(list(budget_ids)))
+    return db.execute(stmt).rowcount
+
+
+def drain_alerts(
+    db: Session,
+    deliver: Callable[[List[BudgetAlertOutbox]], None],
+    batch_size: int = DRAIN_BATCH_SIZE,
+) -> int:
+    """
+    Hand pending alerts to `deliver` in batches, oldest first, and delete
+    each batch once `deliver` returns.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED, so several consumers can
+    drain concurrently without double delivery; if `deliver` raises, the
+    batch is rolled back and stays queued (at-least-once). Returns the
+    number of alerts delivered.
+    """
+    delivered = 0
+    while True:
+        batch = (
+            db.execute(
+                select(BudgetAlertOutbox)
+                .order_by(BudgetAlertOutbox.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if not batch:
+            db.rollback()
+            return delivered
+
+        try:
+            deliver(batch)
+        except Exception:
+            db.rollback()
+            raise
+
+        db.execute(
+            delete(BudgetAlertOutbox).where(
+                BudgetAlertOutbox.id.in_([alert.id for alert in batch])
+            )
+        )
+        db.commit()
+        delivered += len(batch)
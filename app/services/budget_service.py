@@ -1,15 +1,19 @@
-from calendar import monthrange
-from datetime import date
 from decimal import Decimal
 from typing import List
 from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import and_, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.db.models import Budget, BudgetCategory, Transaction
+from app.db.models import Budget, BudgetCategory, TransactionMonthlyRollup
+from app.services import budget_alert_service
+from app.services.rollup_service import NO_WALLET
 from app.schemas.budget import (
     BudgetCreate,
+    BudgetReport,
+    BudgetReportMonth,
     BudgetResponse,
     BudgetSummary,
     BudgetCategorySummary,
@@ -40,7 +44,12 @@ def create_budget(
         month=payload.month,
     )
     db.add(budget)
-    db.flush()  # ensure budget.id is available
+    try:
+        db.flush()  # ensure budget.id is available
+    except IntegrityError as exc:
+        # Lost a race with a concurrent create for the same month
+        db.rollback()
+        raise ValueError("Budget for this month already exists") from exc
 
     for cat in payload.categories:
         db.add(
@@ -50,19 +59,23 @@ def create_budget(
                 limit_amount=cat.limit_amount,
             )
         )
+    db.flush()
+    budget_alert_service.sync_spent(db, [budget.id])
 
     db.commit()
     db.refresh(budget)
     return budget
 
 
-def list_budgets(db: Session, user_id: UUID) -> List[Budget]:
-    return (
-        db.query(Budget)
-        .filter(Budget.user_id == user_id)
-        .order_by(Budget.year.desc(), Budget.month.desc())
-        .all()
-    )
+def list_budgets(
+    db: Session,
+    user_id: UUID,
+    budget_ids: List[UUID] | None = None,
+) -> List[Budget]:
+    query = db.query(Budget).filter(Budget.user_id == user_id)
+    if budget_ids is not None:
+        query = query.filter(Budget.id.in_(budget_ids))
+    return query.order_by(Budget.year.desc(), Budget.month.desc()).all()
 
 
 def _get_budget_or_none(
@@ -80,6 +93,19 @@ def _get_budget_or_none(
     )
 
 
+def _category_summary(category: str, limit_amount, spent) -> BudgetCategorySummary:
+    limit_amount = Decimal(str(limit_amount))
+    spent = Decimal(str(spent))
+    utilization = float(spent / limit_amount * 100) if limit_amount > 0 else 0.0
+    return BudgetCategorySummary(
+        category=category,
+        limit_amount=limit_amount,
+        spent=spent,
+        remaining=limit_amount - spent,
+        utilization_percent=round(utilization, 2),
+    )
+
+
 def get_budget_summary(
     db: Session,
     user_id: UUID,
@@ -89,22 +115,18 @@ def get_budget_summary(
     if not budget:
         return None
 
-    start_day = date(budget.year, budget.month, 1)
-    last_day = monthrange(budget.year, budget.month)[1]
-    end_day = date(budget.year, budget.month, last_day)
-
     rows = (
         db.query(
-            Transaction.category,
-            func.coalesce(func.sum(Transaction.amount), 0),
+            TransactionMonthlyRollup.category,
+            func.coalesce(func.sum(TransactionMonthlyRollup.total), 0),
         )
         .filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "Expense",
-            Transaction.date >= start_day,
-            Transaction.date <= end_day,
+            TransactionMonthlyRollup.user_id == user_id,
+            TransactionMonthlyRollup.type == "Expense",
+            TransactionMonthlyRollup.year == budget.year,
+            TransactionMonthlyRollup.month == budget.month,
         )
-        .group_by(Transaction.category)
+        .group_by(TransactionMonthlyRollup.category)
         .all()
     )
     spent_by_category = {row[0]: Decimal(str(row[1])) for row in rows}
@@ -114,23 +136,14 @@ def get_budget_summary(
     total_spent = Decimal("0")
 
     for cat in budget.categories:
-        limit_amount = Decimal(str(cat.limit_amount))
-        spent = spent_by_category.get(cat.category, Decimal("0"))
-        remaining = limit_amount - spent
-        utilization = float(spent / limit_amount * 100) if limit_amount > 0 else 0.0
-
-        total_limit += limit_amount
-        total_spent += spent
-
-        category_summaries.append(
-            BudgetCategorySummary(
-                category=cat.category,
-                limit_amount=limit_amount,
-                spent=spent,
-                remaining=remaining,
-                utilization_percent=round(utilization, 2),
-            )
+        summary = _category_summary(
+            cat.category,
+            cat.limit_amount,
+            spent_by_category.get(cat.category, Decimal("0")),
         )
+        total_limit += summary.limit_amount
+        total_spent += summary.spent
+        category_summaries.append(summary)
 
     total_remaining = total_limit - total_spent
 
@@ -145,6 +158,187 @@ def get_budget_summary(
     )
 
 
+def get_budget_report(db: Session, user_id: UUID, year: int) -> BudgetReport:
+    """
+    Budget vs actual for every budgeted month and category of `year`.
+
+    One statement: budgets joined to their categories and left-joined to
+    the (month, category) expense totals of the monthly rollups, so the
+    cost does not depend on how many months are budgeted.
+    """
+    R = TransactionMonthlyRollup
+    spent = (
+        select(
+            R.month.label("month"),
+            R.category.label("category"),
+            func.sum(R.total).label("spent"),
+        )
+        .where(
+            R.user_id == user_id,
+            R.type == "Expense",
+            R.year == year,
+        )
+        .group_by(R.month, R.category)
+        .subquery()
+    )
+
+    rows = db.execute(
+        select(
+            Budget.id,
+            Budget.name,
+            Budget.month,
+            BudgetCategory.category,
+            BudgetCategory.limit_amount,
+            func.coalesce(spent.c.spent, 0),
+        )
+        .join(BudgetCategory, BudgetCategory.budget_id == Budget.id)
+        .outerjoin(
+            spent,
+            and_(
+                spent.c.month == Budget.month,
+                spent.c.category == BudgetCategory.category,
+            ),
+        )
+        .where(Budget.user_id == user_id, Budget.year == year)
+        .order_by(Budget.month, BudgetCategory.category)
+    ).all()
+
+    months: List[BudgetReportMonth] = []
+    for budget_id, name, month, category, limit_amount, spent_amount in rows:
+        if not months or months[-1].budget_id != budget_id:
+            months.append(
+                BudgetReportMonth(
+                    month=month,
+                    budget_id=budget_id,
+                    name=name,
+                    categories=[],
+                    total_limit=Decimal("0"),
+                    total_spent=Decimal("0"),
+                    total_remaining=Decimal("0"),
+                )
+            )
+        current = months[-1]
+        summary = _category_summary(category, limit_amount, spent_amount)
+        current.categories.append(summary)
+        current.total_limit += summary.limit_amount
+        current.total_spent += summary.spent
+        current.total_remaining += summary.remaining
+
+    total_limit = sum((m.total_limit for m in months), Decimal("0"))
+    total_spent = sum((m.total_spent for m in months), Decimal("0"))
+
+    return BudgetReport(
+        year=year,
+        months=months,
+        total_limit=total_limit,
+        total_spent=total_spent,
+        total_remaining=total_limit - total_spent,
+    )
+
+
+def rollover_budgets(
+    db: Session,
+    year: int,
+    month: int,
+    carry_over: bool = False,
+    user_id: UUID | None = None,
+) -> List[UUID]:
+    """
+    Clone every user's latest budget before (year, month), per wallet,
+    into (year, month), together with its categories.
+
+    With `carry_over`, each category's limit grows by what was left
+    unspent in the source month (never by a negative amount). Users that
+    already have a budget for the month are skipped through ON CONFLICT
+    DO NOTHING on the (user, wallet, year, month) unique index, so the
+    job is safe to re-run. Spent counters of the new categories start
+    from the rollups.
+
+    Runs as a single statement: an INSERT ... SELECT for the budgets and
+    one for their categories, chained through data-modifying CTEs, across
+    all users or just `user_id`. Returns the new budget ids.
+    """
+    target = year * 12 + month - 1
+    wallet_key = func.coalesce(Budget.wallet_id, NO_WALLET)
+
+    source = (
+        select(Budget.id, Budget.user_id, Budget.wallet_id, Budget.name)
+        .where(Budget.year * 12 + Budget.month - 1 < target)
+        .distinct(Budget.user_id, wallet_key)
+        .order_by(Budget.user_id, wallet_key, Budget.year.desc(), Budget.month.desc())
+    )
+    if user_id is not None:
+        source = source.where(Budget.user_id == user_id)
+    source = source.cte("source")
+
+    created = (
+        pg_insert(Budget)
+        .from_select(
+            ["id", "user_id", "wallet_id", "name", "year", "month"],
+            select(
+                func.gen_random_uuid(),
+                source.c.user_id,
+                source.c.wallet_id,
+                source.c.name,
+                literal(year),
+                literal(month),
+            ),
+        )
+        .on_conflict_do_nothing()
+        .returning(Budget.id, Budget.user_id, Budget.wallet_id)
+        .cte("created")
+    )
+
+    R = TransactionMonthlyRollup
+    already_spent = (
+        select(func.coalesce(func.sum(R.total), 0))
+        .where(
+            R.user_id == created.c.user_id,
+            R.type == "Expense",
+            R.year == year,
+            R.month == month,
+            R.category == BudgetCategory.category,
+        )
+        .scalar_subquery()
+    )
+    limit_amount = BudgetCategory.limit_amount
+    if carry_over:
+        limit_amount = limit_amount + func.greatest(
+            BudgetCategory.limit_amount - BudgetCategory.spent, 0
+        )
+
+    copied = (
+        insert(BudgetCategory)
+        .from_select(
+            ["id", "budget_id", "category", "limit_amount", "spent"],
+            select(
+                func.gen_random_uuid(),
+                created.c.id,
+                BudgetCategory.category,
+                limit_amount,
+                already_spent,
+            )
+            .select_from(created)
+            .join(
+                source,
+                and_(
+                    source.c.user_id == created.c.user_id,
+                    func.coalesce(source.c.wallet_id, NO_WALLET)
+                    == func.coalesce(created.c.wallet_id, NO_WALLET),
+                ),
+            )
+            .join(BudgetCategory, BudgetCategory.budget_id == source.c.id),
+        )
+        .cte("copied")
+    )
+
+    # Postgres runs every data-modifying CTE, referenced or not
+    result = db.execute(select(created.c.id).add_cte(copied))
+    budget_ids = [row[0] for row in result]
+    db.commit()
+    return budget_ids
+
+
 def update_budget(
     db: Session,
     user_id: UUID,
@@ -173,6 +367,9 @@ def update_budget(
         )
 
     db.add(budget)
+    db.flush()
+    budget_alert_service.sync_spent(db, [budget.id])
+
     db.commit()
     db.refresh(budget)
     return budget
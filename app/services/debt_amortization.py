@@ -0,0 +1,183 @@
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from app.services.debt_simulator import DebtItem
+
+
+# Plans that have not cleared after this many months are reported as such
+MAX_MONTHS = 1200
+
+
+def _debt_arrays(debts: List[DebtItem]) -> Dict[str, np.ndarray]:
+    """
+    Debts as parallel arrays, ordered by priority (lower number first).
+    """
+    debts = sorted(debts, key=lambda d: d.priority)
+    return {
+        "name": [d.name for d in debts],
+        "principal": np.array([max(d.remaining, 0.0) for d in debts], dtype=np.float64),
+        "rate": np.array([d.interest_rate or 0.0 for d in debts], dtype=np.float64) / 1200,
+        "emi": np.array([d.emi or 0.0 for d in debts], dtype=np.float64),
+        "fixed": np.array([d.emi is not None for d in debts], dtype=bool),
+        "flexible": np.array([d.emi is None and d.is_flexible for d in debts], dtype=bool),
+    }
+
+
+class _Amortization:
+    """
+    One amortized plan, advanced a month per iteration.
+
+    Iterating yields (month, paid, interest part) per debt and keeps the
+    running totals on the instance, so a caller can summarize a plan or
+    stream its months while holding only the current month.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], cash: float):
+        n = len(arrays["name"])
+        self.arrays = arrays
+        self.cash = cash
+        self.balance = arrays["principal"].copy()
+        self.interest_paid = np.zeros(n)
+        self.principal_paid = np.zeros(n)
+        # Interest accrued while a debt waited for cash is capitalized, and
+        # paid off before principal
+        self.unpaid_interest = np.zeros(n)
+        self.payoff_month = np.zeros(n, dtype=np.int64)
+        self.month = 0
+        self.open = self.balance > 0
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        rate = self.arrays["rate"]
+        emi = self.arrays["emi"]
+        fixed = self.arrays["fixed"]
+        flexible = self.arrays["flexible"]
+
+        while self.open.any() and self.month < MAX_MONTHS:
+            self.month += 1
+            open_ = self.open
+
+            interest = np.where(open_, np.round(self.balance * rate, 2), 0.0)
+            owed = self.balance + interest
+
+            paid = np.where(fixed & open_, np.minimum(emi, owed), 0.0)
+            flexible_owed = np.where(flexible & open_, owed, 0.0)
+            ahead = np.cumsum(flexible_owed) - flexible_owed
+            paid += np.clip(self.cash - ahead, 0.0, flexible_owed)
+            paid = np.round(paid, 2)
+
+            new_balance = np.round(owed - paid, 2)
+            progressed = new_balance < self.balance
+
+            self.unpaid_interest += interest
+            interest_part = np.minimum(paid, self.unpaid_interest)
+            self.unpaid_interest -= interest_part
+            self.interest_paid += interest_part
+            self.principal_paid += paid - interest_part
+
+            cleared = open_ & (new_balance <= 0)
+            self.payoff_month[cleared] = self.month
+            self.balance = np.maximum(new_balance, 0.0)
+            self.open = self.balance > 0
+
+            yield self.month, paid, interest_part
+
+            # Nothing cleared and nothing went down: the same cash split
+            # repeats on larger balances, so it never will
+            if (
+                self.open.any()
+                and not cleared.any()
+                and not (progressed & self.open).any()
+            ):
+                break
+
+
+def _iter_breakdown(run: _Amortization, last_month: int) -> Iterator[Dict]:
+    names = run.arrays["name"]
+    for month, paid, interest_part in run:
+        if month > last_month:
+            return
+        yield {
+            "month": month,
+            "payments": [
+                {
+                    "debt": names[i],
+                    "amount": round(float(paid[i]), 2),
+                    "interest": round(float(interest_part[i]), 2),
+                    "principal": round(float(paid[i] - interest_part[i]), 2),
+                }
+                for i in np.flatnonzero(paid > 0)
+            ],
+        }
+
+
+def amortize_debts(
+    monthly_income: float,
+    living_expenses: float,
+    debts: List[DebtItem],
+    include_breakdown: bool = False,
+) -> Dict:
+    """
+    Interest-aware version of the debt plan.
+
+    Each month every open balance first accrues interest at APR / 12
+    (rounded to the cent), then fixed-EMI debts pay their EMI and free
+    cash goes to flexible debts in priority order, exactly as in the
+    simple model. All debts advance together as NumPy arrays: the
+    priority-order split of free cash is a clip of the cash left after
+    the cumulative balances ahead of each debt, so a month costs a
+    handful of vector operations whatever the number of debts.
+
+    The loop ends when every debt is cleared, when a month clears nothing
+    and no open balance goes down (payments no longer cover interest, so
+    nothing will ever clear), or after MAX_MONTHS. Debts still open then
+    have no payoff month and no interest total; `principal_paid` shows
+    how far they got.
+
+    With `include_breakdown`, `monthly_breakdown` is a generator that
+    replays the plan month by month (a second, lazy pass), so no history
+    is kept in memory.
+    """
+    mandatory_emi = sum(d.emi or 0 for d in debts)
+    free_cash = monthly_income - living_expenses - mandatory_emi
+
+    if free_cash < 0:
+        return {"error": "Expenses + EMI exceed income"}
+
+    arrays = _debt_arrays(debts)
+    cash = max(free_cash, 0.0)
+
+    run = _Amortization(arrays, cash)
+    for _ in run:
+        pass
+
+    names = arrays["name"]
+    principal = arrays["principal"]
+    never = run.open
+    n = len(names)
+    order = np.lexsort((np.arange(n), run.payoff_month, never))
+    cleared_months = run.payoff_month[~never]
+
+    timeline = [
+        {
+            "debt": names[i],
+            "payoff_month": None if never[i] else int(run.payoff_month[i]),
+            "remaining": round(float(principal[i]), 2),
+            "interest_paid": None if never[i] else round(float(run.interest_paid[i]), 2),
+            "principal_paid": round(float(run.principal_paid[i]), 2),
+        }
+        for i in order
+        if principal[i] > 0
+    ]
+
+    result = {
+        "total_months": None if never.any() else int(cleared_months.max(initial=0)),
+        "free_cash": round(free_cash, 2),
+        "total_interest": None if never.any() else round(float(run.interest_paid.sum()), 2),
+        "timeline": timeline,
+    }
+
+    if include_breakdown:
+        last = int(cleared_months.max(initial=0)) if never.any() else run.month
+        result["monthly_breakdown"] = _iter_breakdown(_Amortization(arrays, cash), last)
+    return result
@@ -0,0 +1,274 @@
+from datetime import date
+from typing import Dict, List
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import TransactionMonthlyRollup
+from app.services.planner_service import NON_LIVING_CATEGORIES, load_debt_items
+
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Cap on paths × horizon_months: the sampled-month and cash matrices are
+# that many cells each (8 bytes a cell), so this keeps a run near 80 MB
+MAX_SIMULATION_CELLS = 5_000_000
+
+# Active paths are compacted once fewer than this share are still open
+_COMPACT_RATIO = 0.5
+
+
+def _month_date(today: date, months: int) -> date:
+    """First day of the month `months` after today's month."""
+    year, month0 = divmod(today.year * 12 + today.month - 1 + months, 12)
+    return date(year, month0 + 1, 1)
+
+
+def _monthly_history(
+    db: Session,
+    user_id: UUID,
+    history_months: int,
+    today: date,
+) -> np.ndarray:
+    """
+    Income minus living expenses for each of the user's last
+    `history_months` complete months that have any activity, from the
+    rollups (same categories as the financial summary).
+    """
+    R = TransactionMonthlyRollup
+    month_index = R.year * 12 + R.month - 1
+    current = today.year * 12 + today.month - 1
+    rows = db.execute(
+        select(
+            month_index,
+            func.coalesce(func.sum(R.total).filter(R.type == "Income"), 0),
+            func.coalesce(
+                func.sum(R.total).filter(
+                    R.type == "Expense",
+                    R.category.notin_(NON_LIVING_CATEGORIES),
+                ),
+                0,
+            ),
+        )
+        .where(
+            R.user_id == user_id,
+            month_index < current,
+            month_index >= current - history_months,
+        )
+        .group_by(month_index)
+    ).all()
+    return np.array([float(income) - float(living) for _, income, living in rows])
+
+
+def _fixed_payoff_months(
+    balance: np.ndarray,
+    rate: np.ndarray,
+    emi: np.ndarray,
+) -> np.ndarray:
+    """
+    Months to clear each fixed-EMI debt: n = -log(1 - r·B/E) / log(1 + r),
+    or B / E without interest, rounded up; inf when the EMI does not
+    cover the interest.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = 1.0 - rate * balance / emi
+        with_interest = -np.log(coverage) / np.log1p(rate)
+        months = np.where(rate > 0, with_interest, balance / emi)
+        months = np.where((emi > 0) & (coverage > 0), np.ceil(months - 1e-9), np.inf)
+    return months
+
+
+def simulate_paths(
+    cash: np.ndarray,
+    balance: np.ndarray,
+    rate: np.ndarray,
+) -> np.ndarray:
+    """
+    Pay flexible debts (in priority order) from a (paths × months) matrix
+    of monthly free cash, with monthly interest `rate`.
+
+    All paths advance together: each month is a handful of in-place
+    operations on a (paths × debts) balance matrix. A debt only receives
+    cash once everything ahead of it is paid, so debts cleared on every
+    path drop off the front of the matrix, and paths that have cleared
+    everything are dropped as they finish. Returns the payoff month of
+    every debt on every path, 0 if not cleared within the horizon.
+    """
+    n_paths, horizon = cash.shape
+    payoff = np.zeros((n_paths, len(balance)), dtype=np.int32)
+    if not len(balance):
+        return payoff
+
+    live = np.arange(n_paths)
+    bal = np.tile(balance, (n_paths, 1))
+    growth = 1.0 + rate
+    first = 0  # debts before this are cleared on every live path
+    month_cash = cash[:, 0].copy()
+
+    for month in range(horizon):
+        if len(live) == n_paths:
+            month_cash = cash[:, month]
+        else:
+            month_cash = cash[live, month]
+
+        np.multiply(bal, growth[first:], out=bal)
+        was_open = bal > 0
+        paid = np.cumsum(bal, axis=1)
+        np.subtract(paid, bal, out=paid)
+        np.subtract(month_cash[:, None], paid, out=paid)
+        np.clip(paid, 0.0, bal, out=paid)
+        bal -= paid
+
+        # Sub-cent balances count as cleared
+        cleared = was_open & (bal < 0.005)
+        if cleared.any():
+            rows, cols = np.nonzero(cleared)
+            payoff[live[rows], cols + first] = month + 1
+            bal[cleared] = 0.0
+
+            still_open = bal.any(axis=1)
+            if not still_open.any():
+                break
+            if still_open.sum() < _COMPACT_RATIO * len(live):
+                live = live[still_open]
+                bal = bal[still_open]
+            lead = 0
+            while not bal[:, lead].any():
+                lead += 1
+            if lead:
+                first += lead
+                bal = bal[:, lead:].copy()
+
+    return payoff
+
+
+def _percentile_months(months: np.ndarray) -> List[int | None]:
+    """Percentiles of payoff months; inf (never cleared) maps to None."""
+    values = np.percentile(months, PERCENTILES, method="inverted_cdf")
+    return [None if np.isinf(v) else int(v) for v in values]
+
+
+def run_montecarlo(
+    db: Session,
+    user_id: UUID,
+    paths: int = 10_000,
+    horizon_months: int = 360,
+    history_months: int = 24,
+    target_date: date | None = None,
+    seed: int | None = None,
+    today: date | None = None,
+) -> Dict:
+    """
+    Monte Carlo version of the amortized debt plan.
+
+    Each path draws every future month's income and living expenses
+    together from one of the user's historical months (a bootstrap, so
+    the empirical distribution and the income/expense correlation are
+    kept), builds a (paths × months) free-cash matrix in one call, and
+    feeds it to the flexible debts in priority order. Fixed-EMI debts
+    do not depend on cash; their payoff months are closed-form.
+
+    Returns percentile debt-free dates, per-debt median and 90th
+    percentile payoff dates and, given `target_date`, the share of paths
+    debt-free by then. Paths not debt-free within `horizon_months`
+    count as never (None dates). Raises ValueError when there is no
+    history to sample from or paths × horizon_months exceeds
+    MAX_SIMULATION_CELLS.
+    """
+    if paths * horizon_months > MAX_SIMULATION_CELLS:
+        raise ValueError(
+            f"paths × horizon_months must not exceed {MAX_SIMULATION_CELLS:,} "
+            f"(got {paths * horizon_months:,})"
+        )
+    if today is None:
+        today = date.today()
+
+    history = _monthly_history(db, user_id, history_months, today)
+    if not len(history):
+        raise ValueError("No complete months of history to sample from")
+
+    debts = sorted(load_debt_items(db, user_id), key=lambda d: d.priority)
+    debts = [d for d in debts if d.remaining > 0]
+    fixed = [d for d in debts if d.emi is not None]
+    flexible = [d for d in debts if d.emi is None and d.is_flexible]
+    stuck = [d for d in debts if d.emi is None and not d.is_flexible]
+    mandatory_emi = sum(d.emi for d in fixed)
+
+    # Fixed EMIs are paid regardless of the month's cash
+    fixed_months = _fixed_payoff_months(
+        np.array([d.remaining for d in fixed], dtype=np.float64),
+        np.array([d.interest_rate for d in fixed], dtype=np.float64) / 1200,
+        np.array([d.emi for d in fixed], dtype=np.float64),
+    )
+
+    rng = np.random.default_rng(seed)
+    sampled = rng.integers(0, len(history), size=(paths, horizon_months))
+    cash = np.maximum(history[sampled] - mandatory_emi, 0.0)
+
+    payoff = simulate_paths(
+        cash,
+        np.array([d.remaining for d in flexible], dtype=np.float64),
+        np.array([d.interest_rate for d in flexible], dtype=np.float64) / 1200,
+    )
+    months = np.where(payoff > 0, payoff, np.inf)
+
+    # Debt-free month per path: the last payoff among all debts
+    debt_free = np.zeros(paths)
+    if flexible:
+        debt_free = months.max(axis=1)
+    if fixed:
+        debt_free = np.maximum(debt_free, fixed_months.max())
+    if stuck:
+        debt_free[:] = np.inf
+
+    def dates(values: List[int | None]) -> List[date | None]:
+        return [None if m is None else _month_date(today, m) for m in values]
+
+    debt_results = []
+    for i, d in enumerate(flexible):
+        p50, p90 = _percentile_months(months[:, i])[2::2]
+        debt_results.append(
+            {
+                "debt": d.name,
+                "median_payoff_date": dates([p50])[0],
+                "p90_payoff_date": dates([p90])[0],
+                "probability_cleared": round(float((payoff[:, i] > 0).mean()), 4),
+            }
+        )
+    for d, m in zip(fixed + stuck, list(fixed_months) + [np.inf] * len(stuck)):
+        payoff_date = None if np.isinf(m) else _month_date(today, int(m))
+        debt_results.append(
+            {
+                "debt": d.name,
+                "median_payoff_date": payoff_date,
+                "p90_payoff_date": payoff_date,
+                "probability_cleared": 0.0 if payoff_date is None else 1.0,
+            }
+        )
+
+    probability = None
+    if target_date is not None:
+        target_months = (
+            (target_date.year * 12 + target_date.month)
+            - (today.year * 12 + today.month)
+        )
+        probability = round(float((debt_free <= target_months).mean()), 4)
+
+    return {
+        "paths": paths,
+        "horizon_months": horizon_months,
+        "history_months": int(len(history)),
+        "target_date": target_date,
+        "probability_debt_free_by_target": probability,
+        "percentiles": [
+            {"percentile": p, "months": m, "date": d}
+            for p, m, d in zip(
+                PERCENTILES,
+                _percentile_months(debt_free),
+                dates(_percentile_months(debt_free)),
+            )
+        ],
+        "debts": debt_results,
+    }
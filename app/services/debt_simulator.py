@@ -1,8 +1,23 @@
 # app/services/debt_simulator.py
-from typing import List, Dict, Optional
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+from uuid import UUID
 
 
 class DebtItem:
+    # Plans copy and ship many of these (strategies, solver probes, process
+    # pools); slots keep each one a few fixed fields
+    __slots__ = (
+        "name",
+        "remaining",
+        "emi",
+        "is_flexible",
+        "priority",
+        "interest_rate",
+        "debt_id",
+    )
+
     def __init__(
         self,
         name: str,
@@ -10,12 +25,17 @@ class DebtItem:
         emi: Optional[float],
         is_flexible: bool,
         priority: int,
+        interest_rate: float = 0.0,
+        debt_id: Optional[UUID] = None,
     ):
         self.name = name
         self.remaining = remaining
         self.emi = emi
         self.is_flexible = is_flexible
         self.priority = priority
+        # Annual percentage rate; only the amortized model uses it
+        self.interest_rate = interest_rate
+        self.debt_id = debt_id
 
 
 def simulate_debt_clearance(
@@ -74,3 +94,208 @@ def simulate_debt_clearance(
         "total_months": month,
         "monthly_breakdown": breakdown,
     }
+
+
+def _cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+def _ceil_div(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+def plan_debt_clearance(
+    monthly_income: float,
+    living_expenses: float,
+    debts: List[DebtItem],
+    include_breakdown: bool = False,
+) -> Dict:
+    """
+    Same payment rules as simulate_debt_clearance, solved per payoff
+    event instead of per month, with no horizon cap.
+
+    Fixed-EMI debts clear after ceil(remaining / emi) months. Free cash
+    goes to flexible debts as one queue in priority order, so after m
+    months m × free_cash has been paid into it and the k-th flexible debt
+    clears in month ceil(prefix_remaining_k / free_cash). Every payoff
+    month is computed in closed form (in cents, so there is no float
+    drift) and the events are ordered with one sort: O(debts · log debts)
+    however long the plan runs.
+
+    Returns `total_months` and a `timeline` of payoffs in order; debts
+    that receive nothing each month never clear and come last with
+    `payoff_month` None (as does `total_months`, if there are any). With
+    `include_breakdown`, `monthly_breakdown` is a generator rebuilding
+    the months from the events one at a time.
+    """
+    mandatory_emi = sum(d.emi or 0 for d in debts)
+    free_cash = monthly_income - living_expenses - mandatory_emi
+
+    if free_cash < 0:
+        return {"error": "Expenses + EMI exceed income"}
+
+    # Higher priority = lower number
+    debts = sorted(debts, key=lambda d: d.priority)
+    free_cents = _cents(free_cash)
+
+    # (first month paid, payoff month, last payment) in cents; None = never
+    schedule: List[tuple] = []
+    queued = 0  # flexible balance ahead of the current debt
+    for debt in debts:
+        remaining = _cents(debt.remaining)
+        if remaining <= 0:
+            schedule.append(None)
+            continue
+
+        if debt.emi is not None:
+            emi = _cents(debt.emi)
+            if emi <= 0:
+                schedule.append((1, None, 0))
+                continue
+            months = _ceil_div(remaining, emi)
+            schedule.append((1, months, remaining - (months - 1) * emi))
+            continue
+
+        if debt.is_flexible and free_cents > 0:
+            first = queued // free_cents + 1
+            queued += remaining
+            schedule.append((first, _ceil_div(queued, free_cents), None))
+            continue
+
+        schedule.append((1, None, 0))
+
+    events = [
+        (entry[1], i)
+        for i, entry in enumerate(schedule)
+        if entry is not None and entry[1] is not None
+    ]
+    events.sort()
+    never = [
+        i for i, entry in enumerate(schedule)
+        if entry is not None and entry[1] is None
+    ]
+
+    total_months = events[-1][0] if events else 0
+    if never:
+        total_months = None
+
+    timeline = [
+        {
+            "debt": debts[i].name,
+            "payoff_month": month,
+            "remaining": round(debts[i].remaining, 2),
+        }
+        for month, i in events
+    ] + [
+        {
+            "debt": debts[i].name,
+            "payoff_month": None,
+            "remaining": round(debts[i].remaining, 2),
+        }
+        for i in never
+    ]
+
+    result = {
+        "total_months": total_months,
+        "free_cash": round(free_cash, 2),
+        "timeline": timeline,
+    }
+    if include_breakdown:
+        last_month = events[-1][0] if events else 0
+        result["monthly_breakdown"] = _iter_breakdown(
+            debts, schedule, free_cents, last_month
+        )
+    return result
+
+
+def _iter_breakdown(
+    debts: List[DebtItem],
+    schedule: List[tuple],
+    free_cents: int,
+    last_month: int,
+) -> Iterator[Dict]:
+    """
+    Rebuild simulate_debt_clearance's monthly breakdown from the payoff
+    schedule, up to the last month in which a debt clears.
+    """
+    # Flexible debts take a slice of the cumulative queue payments
+    starts = {}
+    queued = 0
+    for i, debt in enumerate(debts):
+        entry = schedule[i]
+        if entry is not None and entry[2] is None:
+            starts[i] = queued
+            queued += _cents(debt.remaining)
+
+    for month in range(1, last_month + 1):
+        snapshot = {"month": month, "payments": []}
+        for i, debt in enumerate(debts):
+            entry = schedule[i]
+            if entry is None or entry[1] is None:
+                continue
+            first, payoff, last_payment = entry
+            if month < first or month > payoff:
+                continue
+
+            if last_payment is not None:
+                cents = last_payment if month == payoff else _cents(debt.emi)
+            else:
+                start = starts[i]
+                end = start + _cents(debt.remaining)
+                paid_to = min(month * free_cents, end)
+                paid_from = max((month - 1) * free_cents, start)
+                cents = paid_to - paid_from
+
+            snapshot["payments"].append(
+                {"debt": debt.name, "amount": round(cents / 100, 2)}
+            )
+        yield snapshot
+
+
+def _run_key(payments: List[Dict]) -> List[tuple]:
+    return [(p["debt"], p["amount"]) for p in payments]
+
+
+def collapse_runs(months: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Run-length encode a monthly breakdown: consecutive months paying the
+    same amounts to the same debts become one {from_month, to_month,
+    payments} entry. Amounts stay per month; an interest/principal split
+    (amortized model) is summed over the run.
+    """
+    run = None
+    key = None
+    for month in months:
+        payments = month["payments"]
+        if run is not None and _run_key(payments) == key:
+            run["to_month"] = month["month"]
+            for total, p in zip(run["payments"], payments):
+                if "interest" in p:
+                    total["interest"] = round(total["interest"] + p["interest"], 2)
+                    total["principal"] = round(total["principal"] + p["principal"], 2)
+            continue
+        if run is not None:
+            yield run
+        key = _run_key(payments)
+        run = {
+            "from_month": month["month"],
+            "to_month": month["month"],
+            "payments": [dict(p) for p in payments],
+        }
+    if run is not None:
+        yield run
+
+
+def page(entries: Iterable[Dict], offset: int, limit: Optional[int]) -> Iterator[Dict]:
+    stop = None if limit is None else offset + limit
+    return islice(entries, offset, stop)
+
+
+def iter_ndjson(plan: Dict, months: Iterable[Dict]) -> Iterator[bytes]:
+    """
+    A plan as NDJSON: the plan without its breakdown on the first line,
+    then one line per month, encoded as the months are produced.
+    """
+    yield (json.dumps(plan) + "\n").encode()
+    for month in months:
+        yield (json.dumps(month) + "\n").encode()
@@ -0,0 +1,97 @@
+import math
+from typing import Callable, Dict, List
+
+from app.services.debt_amortization import amortize_debts
+from app.services.debt_simulator import DebtItem, plan_debt_clearance
+
+
+ENGINES: Dict[str, Callable[..., Dict]] = {
+    "simple": plan_debt_clearance,
+    "amortized": amortize_debts,
+}
+
+
+def _clears_by(plan: Dict, months: int) -> bool:
+    return (
+        "error" not in plan
+        and plan["total_months"] is not None
+        and plan["total_months"] <= months
+    )
+
+
+def solve_extra_payment(
+    monthly_income: float,
+    living_expenses: float,
+    debts: List[DebtItem],
+    months: int,
+    model: str = "simple",
+) -> Dict:
+    """
+    Smallest extra monthly payment (in cents) that clears every debt
+    within `months` months.
+
+    The extra amount adds to the free cash that flows to flexible debts;
+    fixed EMIs pay on their own schedule, so if one of them (or a debt
+    that is never paid) runs past the target no amount helps.
+
+    In the simple model the flexible queue clears in
+    ceil(total_flexible / free_cash) months, so the answer is analytic:
+    free cash of total_flexible / months, rounded up to the cent. The
+    amortized model is bisected over cents between "nothing extra" and
+    "pay off every flexible debt, with a month's interest, in month one",
+    which takes about log2(upper bound in cents) probes — a few dozen at
+    most. Every probe runs on the same in-memory `debts`.
+    """
+    engine = ENGINES[model]
+    free_cash = monthly_income - living_expenses - sum(d.emi or 0 for d in debts)
+    # Never less than what brings free cash back to zero
+    floor_cents = max(math.ceil(round(-free_cash * 100, 6)), 0)
+
+    flexible = [
+        d for d in debts if d.emi is None and d.is_flexible and d.remaining > 0
+    ]
+    ceiling_cents = floor_cents + math.ceil(
+        sum(d.remaining * (1 + (d.interest_rate or 0) / 1200) for d in flexible) * 100
+    )
+
+    probes = 0
+
+    def plan_with(extra_cents: int) -> Dict:
+        nonlocal probes
+        probes += 1
+        return engine(monthly_income + extra_cents / 100, living_expenses, debts)
+
+    best = plan_with(ceiling_cents)
+    if not _clears_by(best, months):
+        return {
+            "status": "not_possible",
+            "message": "Fixed EMIs or debts without payments run past the target date",
+            "probes": probes,
+        }
+
+    lo, hi = floor_cents, ceiling_cents
+    if model == "simple":
+        total_cents = sum(round(d.remaining * 100) for d in flexible)
+        needed = -(-total_cents // months) - round(free_cash * 100)
+        hi = min(max(needed, floor_cents), ceiling_cents)
+        best = plan_with(hi)
+    else:
+        # Invariant: hi clears in time; lo - 1 is known not to
+        if _clears_by(plan := plan_with(lo), months):
+            hi, best = lo, plan
+        while lo < hi:
+            mid = (lo + hi) // 2
+            plan = plan_with(mid)
+            if _clears_by(plan, months):
+                hi, best = mid, plan
+            else:
+                lo = mid + 1
+
+    return {
+        "status": "possible",
+        "extra_monthly_payment": round(hi / 100, 2),
+        "free_cash": round(free_cash, 2),
+        "total_months": best["total_months"],
+        "total_interest": best.get("total_interest"),
+        "probes": probes,
+    }
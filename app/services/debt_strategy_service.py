@@ -0,0 +1,145 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+from uuid import UUID
+
+from app.config import PLANNER_WORKERS
+from app.services.debt_amortization import amortize_debts
+from app.services.debt_simulator import DebtItem
+
+
+STRATEGIES = ("priority", "avalanche", "snowball", "custom")
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_executor() -> ProcessPoolExecutor | None:
+    """
+    The shared planner process pool, started on first use; None when
+    PLANNER_WORKERS is 1 (run in-process).
+
+    Workers are spawned rather than forked, so they never inherit the
+    web server's threads, DB connections or locks.
+    """
+    global _executor
+    if PLANNER_WORKERS <= 1:
+        return None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PLANNER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def order_debts(
+    debts: List[DebtItem],
+    strategy: str,
+    custom_order: List[UUID] | None = None,
+) -> List[DebtItem]:
+    """
+    Copies of `debts` re-prioritised for a strategy (0 = paid first).
+
+    - priority: the stored priority field
+    - avalanche: highest interest rate first
+    - snowball: smallest remaining balance first
+    - custom: debts listed in `custom_order` first, in that order, then
+      the rest by stored priority
+
+    Ties keep the stored priority order. Only the flexible debts compete
+    for free cash, so the order only changes how they are paid.
+    """
+    if strategy == "avalanche":
+        key = lambda d: (-d.interest_rate, d.priority)
+    elif strategy == "snowball":
+        key = lambda d: (d.remaining, d.priority)
+    elif strategy == "custom":
+        rank = {debt_id: i for i, debt_id in enumerate(custom_order or [])}
+        key = lambda d: (rank.get(d.debt_id, len(rank)), d.priority)
+    else:
+        key = lambda d: d.priority
+
+    return [
+        DebtItem(
+            name=d.name,
+            remaining=d.remaining,
+            emi=d.emi,
+            is_flexible=d.is_flexible,
+            priority=i,
+            interest_rate=d.interest_rate,
+            debt_id=d.debt_id,
+        )
+        for i, d in enumerate(sorted(debts, key=key))
+    ]
+
+
+def run_strategy(
+    strategy: str,
+    monthly_income: float,
+    living_expenses: float,
+    debts: List[DebtItem],
+) -> Dict:
+    """
+    One strategy's amortized plan, reduced to its headline figures.
+    Top-level so it can run in a worker process.
+    """
+    plan = amortize_debts(monthly_income, living_expenses, debts)
+    return {
+        "strategy": strategy,
+        "total_months": plan["total_months"],
+        "total_interest": plan["total_interest"],
+        "timeline": [
+            {
+                "debt": p["debt"],
+                "payoff_month": p["payoff_month"],
+                "remaining": p["remaining"],
+                "interest_paid": p["interest_paid"],
+            }
+            for p in plan["timeline"]
+        ],
+    }
+
+
+def compare_strategies(
+    monthly_income: float,
+    living_expenses: float,
+    debts: List[DebtItem],
+    custom_order: List[UUID] | None = None,
+) -> Dict:
+    """
+    Run the amortized plan under every payoff ordering and return months
+    to freedom, total interest and per-debt payoff months for each.
+
+    The same in-memory debt snapshot feeds every strategy; the runs are
+    independent, so they go to the planner process pool concurrently.
+    `custom` is only run when `custom_order` is given; ids in it that
+    are not among `debts` raise ValueError.
+    """
+    free_cash = monthly_income - living_expenses - sum(d.emi or 0 for d in debts)
+    if free_cash < 0:
+        return {"error": "Expenses + EMI exceed income"}
+
+    strategies = [s for s in STRATEGIES if s != "custom"]
+    if custom_order:
+        known = {d.debt_id for d in debts}
+        unknown = [str(debt_id) for debt_id in custom_order if debt_id not in known]
+        if unknown:
+            raise ValueError(f"Unknown debt ids in order: {', '.join(unknown)}")
+        strategies.append("custom")
+
+    jobs = [
+        (s, monthly_income, living_expenses, order_debts(debts, s, custom_order))
+        for s in strategies
+    ]
+
+    executor = get_executor()
+    if executor is None:
+        results = [run_strategy(*job) for job in jobs]
+    else:
+        futures = [executor.submit(run_strategy, *job) for job in jobs]
+        results = [future.result() for future in futures]
+
+    return {
+        "free_cash": round(free_cash, 2),
+        "strategies": results,
+    }
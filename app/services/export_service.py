@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+from typing import Iterator, List, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.db.models import Transaction
+from app.db.session import SessionLocal
+from app.services.transaction_service import TransactionFilters, apply_filters
+
+
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_COLUMNS = (
+    "id",
+    "date",
+    "type",
+    "category",
+    "amount",
+    "payment_mode",
+    "wallet_id",
+    "created_at",
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _iter_row_batches(
+    user_id: UUID,
+    filters: TransactionFilters,
+) -> Iterator[Sequence]:
+    """
+    Yield lists of plain row tuples read through a server-side cursor.
+
+    Only scalar columns are selected (no ORM identity map), and with
+    `yield_per` psycopg2 uses a named cursor, so at most one batch is held
+    in memory regardless of how many rows the user has.
+
+    The generator owns its session because it outlives the request
+    handler that returned the StreamingResponse.
+    """
+    stmt = select(*(getattr(Transaction, c) for c in EXPORT_COLUMNS))
+    stmt = apply_filters(stmt, user_id, filters)
+    stmt = stmt.order_by(Transaction.date, Transaction.id).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+
+    db = SessionLocal()
+    try:
+        for batch in db.execute(stmt).partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    if isinstance(value, UUID):
+        return str(value)
+    return value.isoformat()
+
+
+def _iter_csv(batches: Iterator[Sequence]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode()
+
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            ["" if v is None else _jsonable(v) for v in row] for row in batch
+        )
+        yield buffer.getvalue().encode()
+
+
+def _iter_ndjson(batches: Iterator[Sequence]) -> Iterator[bytes]:
+    for batch in batches:
+        lines = [
+            json.dumps(dict(zip(EXPORT_COLUMNS, map(_jsonable, row))))
+            for row in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands written bytes back to the caller.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_parquet(batches: Iterator[Sequence]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("id", pa.string()),
+            ("date", pa.date32()),
+            ("type", pa.string()),
+            ("category", pa.string()),
+            ("amount", pa.float64()),
+            ("payment_mode", pa.string()),
+            ("wallet_id", pa.string()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+        ]
+    )
+
+    sink = _ChunkSink()
+    # One row group per batch; each is flushed to the client as written
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            columns = list(zip(*batch))
+            columns[0] = [str(v) for v in columns[0]]
+            columns[6] = [str(v) if v is not None else None for v in columns[6]]
+            arrays = [
+                pa.array(col, type=field.type)
+                for col, field in zip(columns, schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_transactions(
+    user_id: UUID,
+    filters: TransactionFilters,
+    fmt: str,
+) -> Iterator[bytes]:
+    """
+    Chunked byte stream of the user's filtered transactions in `fmt`
+    ("csv", "ndjson" or "parquet"), oldest first.
+    """
+    batches = _iter_row_batches(user_id, filters)
+    if fmt == "ndjson":
+        return _iter_ndjson(batches)
+    if fmt == "parquet":
+        return _iter_parquet(batches)
+    return _iter_csv(batches)
@@ -0,0 +1,258 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import Debt, RecurringTransaction, TransactionMonthlyRollup
+from app.services.planner_service import OPEN_DEBT
+
+
+GRANULARITIES = ("daily", "monthly")
+
+# Frequency codes; anything unrecognised advances 30 days like _next_date
+_DAILY, _WEEKLY, _MONTHLY, _YEARLY, _OTHER = range(5)
+_FREQUENCY_CODES = {
+    "daily": _DAILY,
+    "weekly": _WEEKLY,
+    "monthly": _MONTHLY,
+    "yearly": _YEARLY,
+}
+_STEP_DAYS = np.array([1, 7, 0, 0, 30])
+
+
+def _days(d: date) -> int:
+    return int(np.datetime64(d, "D").astype(np.int64))
+
+
+def _add_months(d: date, months: int) -> date:
+    year, month0 = divmod(d.month - 1 + months, 12)
+    year += d.year
+    return date(year, month0 + 1, min(d.day, monthrange(year, month0 + 1)[1]))
+
+
+def _month_start(month_index: np.ndarray) -> np.ndarray:
+    """Day number of the 1st of each absolute month (months since 1970-01)."""
+    return month_index.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+
+def _month_of(days: np.ndarray) -> np.ndarray:
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _occurrence_days(
+    frequency: np.ndarray,
+    first: np.ndarray,
+    k: np.ndarray,
+) -> np.ndarray:
+    """
+    Date (day number) of the k-th run of a template whose next run is
+    `first`, following recurring_service._next_date: monthly runs after
+    the first fall on min(day, 28); yearly runs keep month and day
+    (Feb 29 falls back to Feb 28).
+    """
+    first_month = _month_of(first)
+    first_dom = first - _month_start(first_month)  # 0-based
+
+    by_step = first + k * _STEP_DAYS[frequency]
+
+    monthly = np.where(
+        k == 0,
+        first,
+        _month_start(first_month + k) + np.minimum(first_dom, 27),
+    )
+
+    year_month = first_month + 12 * k
+    month_length = _month_start(year_month + 1) - _month_start(year_month)
+    yearly = _month_start(year_month) + np.minimum(first_dom, month_length - 1)
+
+    return np.select(
+        [frequency == _MONTHLY, frequency == _YEARLY],
+        [monthly, yearly],
+        default=by_step,
+    )
+
+
+def _run_counts(frequency: np.ndarray, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """Number of runs of each template falling on or before `last`."""
+    counts = np.zeros(len(first), dtype=np.int64)
+    in_range = first <= last
+
+    step = _STEP_DAYS[frequency]
+    stepped = in_range & (step > 0)
+    counts[stepped] = (last - first)[stepped] // step[stepped] + 1
+
+    # Calendar frequencies: guess k from the month distance, then step
+    # back once if that run overshoots
+    months_apart = _month_of(last) - _month_of(first)
+    guess = np.where(frequency == _YEARLY, months_apart // 12, months_apart)
+    guess = np.maximum(guess, 0)
+    overshoot = _occurrence_days(frequency, first, guess) > last
+    calendar = in_range & (step == 0)
+    counts[calendar] = (guess - overshoot + 1)[calendar]
+    return counts
+
+
+def _expand(counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(template index, run number) for every run, without a Python loop."""
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.arange(total) - offsets
+
+
+def _starting_balance(db: Session, user_id: UUID) -> float:
+    R = TransactionMonthlyRollup
+    balance = db.execute(
+        select(
+            func.coalesce(func.sum(R.total).filter(R.type == "Income"), 0)
+            - func.coalesce(func.sum(R.total).filter(R.type == "Expense"), 0)
+        ).where(R.user_id == user_id)
+    ).scalar()
+    return float(balance)
+
+
+def forecast_balance(
+    db: Session,
+    user_id: UUID,
+    months: int,
+    granularity: str = "monthly",
+    starting_balance: float | None = None,
+    today: date | None = None,
+) -> dict:
+    """
+    Project the user's balance `months` ahead.
+
+    Every active recurring template is expanded over the horizon from its
+    next_run_date (respecting end_date), and every fixed-EMI debt pays its
+    EMI on the 1st of each following month until its remaining amount is
+    cleared. Runs that are already due but not yet materialized count on
+    the first day. The starting balance defaults to income minus expenses
+    recorded so far.
+
+    All templates are expanded at once with NumPy date arithmetic and
+    binned per day with bincount, so cost grows with the number of runs,
+    not with templates × Python calls.
+    """
+    if today is None:
+        today = date.today()
+    start = _days(today)
+    end = _days(_add_months(today, months))
+    n_days = end - start + 1
+
+    if starting_balance is None:
+        starting_balance = _starting_balance(db, user_id)
+
+    # --- recurring templates -------------------------------------------
+    templates = db.execute(
+        select(
+            RecurringTransaction.frequency,
+            RecurringTransaction.next_run_date,
+            RecurringTransaction.end_date,
+            RecurringTransaction.type,
+            RecurringTransaction.amount,
+        ).where(
+            RecurringTransaction.user_id == user_id,
+            RecurringTransaction.is_active.is_(True),
+        )
+    ).all()
+
+    income = np.zeros(n_days)
+    expenses = np.zeros(n_days)
+
+    if templates:
+        frequency = np.array(
+            [_FREQUENCY_CODES.get(t.frequency.lower(), _OTHER) for t in templates]
+        )
+        first = np.array([_days(t.next_run_date) for t in templates], dtype=np.int64)
+        last = np.array(
+            [min(_days(t.end_date), end) if t.end_date else end for t in templates],
+            dtype=np.int64,
+        )
+        amount = np.array([t.amount for t in templates], dtype=np.float64)
+        is_income = np.array([t.type == "Income" for t in templates])
+        is_expense = np.array([t.type == "Expense" for t in templates])
+
+        owner, k = _expand(_run_counts(frequency, first, last))
+        run_day = _occurrence_days(frequency[owner], first[owner], k)
+        bucket = np.maximum(run_day - start, 0)
+
+        income = np.bincount(
+            bucket, weights=np.where(is_income[owner], amount[owner], 0.0), minlength=n_days
+        )
+        expenses = np.bincount(
+            bucket, weights=np.where(is_expense[owner], amount[owner], 0.0), minlength=n_days
+        )
+
+    # --- fixed EMIs -----------------------------------------------------
+    debts = db.execute(
+        select(Debt.remaining_amount, Debt.emi_amount).where(
+            Debt.user_id == user_id,
+            Debt.is_flexible.is_(False),
+            Debt.emi_amount > 0,
+            *OPEN_DEBT,
+        )
+    ).all()
+
+    emi = np.zeros(n_days)
+    if debts:
+        remaining = np.array([float(d.remaining_amount) for d in debts])
+        instalment = np.array([float(d.emi_amount) for d in debts])
+
+        first_due_month = _month_of(np.array([start]))[0] + 1
+        horizon_months = _month_of(np.array([end]))[0] - first_due_month + 1
+        payments = np.minimum(np.ceil(remaining / instalment).astype(np.int64), horizon_months)
+
+        owner, k = _expand(payments)
+        paid_before = k * instalment[owner]
+        amount_due = np.minimum(instalment[owner], remaining[owner] - paid_before)
+        due_day = _month_start(first_due_month + k)
+        emi = np.bincount(due_day - start, weights=amount_due, minlength=n_days)
+
+    balance = starting_balance + np.cumsum(income - expenses - emi)
+
+    # --- shape the output -------------------------------------------------
+    day_numbers = np.arange(start, end + 1)
+    if granularity == "monthly":
+        month = _month_of(day_numbers)
+        _, first_of_period = np.unique(month, return_index=True)
+        last_of_period = np.append(first_of_period[1:] - 1, n_days - 1)
+        income = np.add.reduceat(income, first_of_period)
+        expenses = np.add.reduceat(expenses, first_of_period)
+        emi = np.add.reduceat(emi, first_of_period)
+        point_days = day_numbers[last_of_period]
+        point_balance = balance[last_of_period]
+    else:
+        point_days = day_numbers
+        point_balance = balance
+
+    point_dates = point_days.astype("datetime64[D]").tolist()
+    lowest = int(np.argmin(balance))
+
+    return {
+        "start_date": today,
+        "end_date": _add_months(today, months),
+        "granularity": granularity,
+        "starting_balance": round(starting_balance, 2),
+        "ending_balance": round(float(balance[-1]), 2),
+        "lowest_balance": round(float(balance[lowest]), 2),
+        "lowest_balance_date": today + timedelta(days=lowest),
+        "points": [
+            {
+                "date": d,
+                "income": round(i, 2),
+                "expenses": round(x, 2),
+                "emi": round(e, 2),
+                "balance": round(b, 2),
+            }
+            for d, i, x, e, b in zip(
+                point_dates,
+                income.tolist(),
+                expenses.tolist(),
+                emi.tolist(),
+                point_balance.tolist(),
+            )
+        ],
+    }
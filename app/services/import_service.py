@@ -0,0 +1,411 @@
+import csv
+import io
+import re
+import uuid
+from datetime import date, datetime
+from typing import IO, Dict, Iterator, List, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    Date,
+    Float,
+    String,
+    cast,
+    column,
+    insert,
+    literal,
+    select,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.db.models import Transaction
+from app.schemas.transaction import (
+    TransactionCreate,
+    TransactionImportError,
+    TransactionImportResponse,
+)
+from app.services import wallet_service
+from app.services.rollup_service import RollupDeltas
+from app.services.transaction_service import (
+    apply_transaction_changes,
+    transaction_content_hash,
+)
+
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+_READ_CHUNK = 64 * 1024
+
+_EXTENSION_FORMATS = {
+    "csv": "csv",
+    "ofx": "ofx",
+    "qfx": "ofx",
+    "qif": "qif",
+}
+
+# Normalized CSV header -> TransactionCreate field
+_CSV_ALIASES = {
+    "date": "date",
+    "transactiondate": "date",
+    "posteddate": "date",
+    "valuedate": "date",
+    "type": "type",
+    "category": "category",
+    "amount": "amount",
+    "debit": "debit",
+    "withdrawal": "debit",
+    "credit": "credit",
+    "deposit": "credit",
+    "paymentmode": "payment_mode",
+    "mode": "payment_mode",
+}
+
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+# (record number, parsed payload or None, error message or None)
+ParsedRecord = Tuple[int, dict | None, str | None]
+
+
+def detect_format(filename: str | None) -> str | None:
+    if not filename or "." not in filename:
+        return None
+    return _EXTENSION_FORMATS.get(filename.rsplit(".", 1)[1].lower())
+
+
+def _parse_amount(raw: str) -> float:
+    text = raw.strip().replace(",", "")
+    for symbol in ("₹", "$", "€", "£"):
+        text = text.replace(symbol, "")
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    value = float(text)
+    return -value if negative else value
+
+
+def _normalize_type(raw: str | None, signed_amount: float) -> str:
+    if raw:
+        lowered = raw.strip().lower()
+        if lowered in ("income", "credit", "cr"):
+            return "Income"
+        if lowered in ("expense", "debit", "dr"):
+            return "Expense"
+    return "Income" if signed_amount > 0 else "Expense"
+
+
+def _iter_csv_records(
+    stream: IO[str],
+    date_format: str,
+    default_category: str,
+) -> Iterator[ParsedRecord]:
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    mapping: Dict[int, str] = {}
+    for position, name in enumerate(header):
+        key = re.sub(r"[\s_\-]", "", name.strip().lower())
+        if key in _CSV_ALIASES:
+            mapping[position] = _CSV_ALIASES[key]
+
+    for record, row in enumerate(reader, start=1):
+        if not any(cell.strip() for cell in row):
+            continue
+
+        fields = {
+            field: row[position].strip()
+            for position, field in mapping.items()
+            if position < len(row)
+        }
+        try:
+            if fields.get("amount"):
+                signed = _parse_amount(fields["amount"])
+            elif fields.get("debit"):
+                signed = -abs(_parse_amount(fields["debit"]))
+            elif fields.get("credit"):
+                signed = abs(_parse_amount(fields["credit"]))
+            else:
+                raise ValueError("Missing amount")
+
+            yield record, {
+                "date": datetime.strptime(fields.get("date", ""), date_format).date(),
+                "type": _normalize_type(fields.get("type"), signed),
+                "category": fields.get("category") or default_category,
+                "amount": abs(signed),
+                "payment_mode": fields.get("payment_mode") or None,
+            }, None
+        except ValueError as exc:
+            yield record, None, str(exc)
+
+
+def _parse_qif_date(raw: str, date_format: str) -> date:
+    text = raw.strip().replace("'", "/").replace(" ", "")
+    try:
+        return datetime.strptime(text, date_format).date()
+    except ValueError:
+        # Quicken's two-digit year variant, e.g. 1/31'26
+        return datetime.strptime(text, date_format.replace("%Y", "%y")).date()
+
+
+def _iter_qif_records(
+    stream: IO[str],
+    date_format: str,
+    default_category: str,
+) -> Iterator[ParsedRecord]:
+    record = 0
+    current: Dict[str, str] = {}
+
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+
+        code, value = line[0], line[1:].strip()
+        if code != "^":
+            # First occurrence wins (split lines repeat L/$ codes)
+            current.setdefault(code, value)
+            continue
+
+        record += 1
+        fields, current = current, {}
+        try:
+            signed = _parse_amount(fields.get("T") or fields.get("U") or "")
+            category = fields.get("L", "").strip("[]") or default_category
+            yield record, {
+                "date": _parse_qif_date(fields.get("D", ""), date_format),
+                "type": _normalize_type(None, signed),
+                "category": category,
+                "amount": abs(signed),
+                "payment_mode": None,
+            }, None
+        except ValueError as exc:
+            yield record, None, str(exc)
+
+
+def _iter_ofx_blocks(stream: IO[str]) -> Iterator[str]:
+    """
+    Yield the body of each <STMTTRN> aggregate, reading the file in
+    fixed-size chunks so only the unparsed tail is kept in memory.
+    """
+    buffer = ""
+    while True:
+        chunk = stream.read(_READ_CHUNK)
+        if not chunk:
+            return
+        buffer += chunk
+
+        while True:
+            upper = buffer.upper()
+            start = upper.find("<STMTTRN>")
+            if start == -1:
+                buffer = buffer[-len("<STMTTRN>"):]
+                break
+            end = upper.find("</STMTTRN>", start)
+            if end == -1:
+                buffer = buffer[start:]
+                break
+            yield buffer[start + len("<STMTTRN>"):end]
+            buffer = buffer[end + len("</STMTTRN>"):]
+
+
+def _iter_ofx_records(
+    stream: IO[str],
+    default_category: str,
+) -> Iterator[ParsedRecord]:
+    for record, block in enumerate(_iter_ofx_blocks(stream), start=1):
+        fields = {
+            tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(block)
+        }
+        try:
+            signed = _parse_amount(fields.get("TRNAMT", ""))
+            trn_type = fields.get("TRNTYPE")
+            yield record, {
+                "date": datetime.strptime(fields.get("DTPOSTED", "")[:8], "%Y%m%d").date(),
+                "type": _normalize_type(None, signed),
+                "category": default_category,
+                "amount": abs(signed),
+                "payment_mode": trn_type.lower() if trn_type else None,
+            }, None
+        except ValueError as exc:
+            yield record, None, str(exc)
+
+
+def _insert_new_rows(db: Session, user_id: UUID, rows: List[tuple]) -> int:
+    """
+    Insert one batch, skipping rows whose content hash the user already has.
+
+    The batch is sent as a VALUES list and filtered with a NOT EXISTS
+    anti-join on (user_id, content_hash), so dedupe is one indexed
+    statement per batch rather than a lookup per row. The rows actually
+    inserted are returned to update the rollups.
+    """
+    incoming = values(
+        column("id", PG_UUID(as_uuid=True)),
+        column("wallet_id", PG_UUID(as_uuid=True)),
+        column("date", Date),
+        column("type", String),
+        column("category", String),
+        column("amount", Float),
+        column("payment_mode", String),
+        column("content_hash", String),
+        name="incoming",
+    ).data(rows)
+
+    already_imported = (
+        select(Transaction.id)
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.content_hash == incoming.c.content_hash,
+        )
+        .exists()
+    )
+
+    stmt = insert(Transaction).from_select(
+        [
+            "id",
+            "user_id",
+            "wallet_id",
+            "date",
+            "type",
+            "category",
+            "amount",
+            "payment_mode",
+            "content_hash",
+        ],
+        select(
+            incoming.c.id,
+            literal(user_id, PG_UUID(as_uuid=True)),
+            # All-NULL VALUES columns resolve to text; cast them back
+            cast(incoming.c.wallet_id, PG_UUID(as_uuid=True)),
+            incoming.c.date,
+            incoming.c.type,
+            incoming.c.category,
+            incoming.c.amount,
+            cast(incoming.c.payment_mode, String),
+            incoming.c.content_hash,
+        ).where(~already_imported),
+    ).returning(
+        Transaction.wallet_id,
+        Transaction.date,
+        Transaction.type,
+        Transaction.category,
+        Transaction.amount,
+    )
+    inserted = db.execute(stmt).all()
+
+    deltas = RollupDeltas()
+    for wallet_id, tx_date, tx_type, category, amount in inserted:
+        deltas.add(user_id, wallet_id, tx_date, tx_type, category, amount)
+    apply_transaction_changes(db, deltas)
+
+    return len(inserted)
+
+
+def import_transactions(
+    db: Session,
+    user_id: UUID,
+    fileobj: IO[bytes],
+    fmt: str,
+    date_format: str | None = None,
+    default_category: str = "Uncategorized",
+    wallet_id: UUID | None = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> TransactionImportResponse:
+    """
+    Import a bank statement (CSV, OFX/QFX or QIF) for a single user.
+
+    The file is decoded and parsed as a stream, validated against
+    TransactionCreate and written in batches of `batch_size`, each batch
+    committed on its own. Rows already present for the user (same content
+    hash) are skipped, so re-importing overlapping statements is safe.
+    Raises ValueError if `wallet_id` is not a wallet the user is a member
+    of.
+    """
+    wallet_service.check_wallet_access(db, user_id, wallet_id)
+
+    stream = io.TextIOWrapper(fileobj, encoding="utf-8-sig", errors="replace", newline="")
+
+    if fmt == "csv":
+        records = _iter_csv_records(stream, date_format or "%Y-%m-%d", default_category)
+    elif fmt == "qif":
+        records = _iter_qif_records(stream, date_format or "%m/%d/%Y", default_category)
+    elif fmt == "ofx":
+        records = _iter_ofx_records(stream, default_category)
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    processed = imported = failed = 0
+    errors: List[TransactionImportError] = []
+    occurrences: Dict[str, int] = {}
+    batch: List[tuple] = []
+
+    def flush() -> None:
+        nonlocal imported
+        if batch:
+            imported += _insert_new_rows(db, user_id, batch)
+            db.commit()
+            batch.clear()
+
+    for record, raw, error in records:
+        processed += 1
+
+        if raw is not None:
+            try:
+                payload = TransactionCreate.model_validate(raw)
+            except ValidationError as exc:
+                error = "; ".join(e["msg"] for e in exc.errors())
+
+        if error is not None:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(TransactionImportError(record=record, message=error))
+            continue
+
+        base_hash = transaction_content_hash(
+            user_id,
+            payload.date,
+            payload.amount,
+            payload.category,
+            payload.payment_mode,
+        )
+        occurrence = occurrences.get(base_hash, 0)
+        occurrences[base_hash] = occurrence + 1
+        content_hash = base_hash if occurrence == 0 else transaction_content_hash(
+            user_id,
+            payload.date,
+            payload.amount,
+            payload.category,
+            payload.payment_mode,
+            occurrence=occurrence,
+        )
+
+        batch.append(
+            (
+                uuid.uuid4(),
+                wallet_id,
+                payload.date,
+                payload.type,
+                payload.category,
+                payload.amount,
+                payload.payment_mode,
+                content_hash,
+            )
+        )
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+
+    return TransactionImportResponse(
+        format=fmt,
+        processed=processed,
+        imported=imported,
+        duplicates=processed - failed - imported,
+        failed=failed,
+        errors=errors,
+    )
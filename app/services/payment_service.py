@@ -0,0 +1,180 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from typing import List, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.db.models import Debt, Payment
+from app.schemas.payment import PaymentCreate
+from app.services import planner_cache, wallet_service
+from app.services.transaction_service import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+MAX_BULK_PAYMENTS = 1_000
+
+
+class DebtVersionConflict(ValueError):
+    """
+    The debt was modified after the version the client based its write on.
+    """
+
+
+def record_payments(
+    db: Session,
+    user_id: UUID,
+    debt_id: UUID,
+    items: List[PaymentCreate],
+    expected_version: int | None = None,
+    today: date | None = None,
+) -> dict | None:
+    """
+    Apply one or more payments to a debt in a single DB transaction.
+
+    The balance moves in one conditional statement,
+    `UPDATE debts SET remaining_amount = remaining_amount - :total,
+    version = version + 1 ... WHERE remaining_amount >= :total RETURNING ...`,
+    so concurrent payments serialize on the row lock and can never take
+    the balance below zero; there is no read-modify-write in Python. The
+    payment rows are then written with one multi-row INSERT. A debt paid
+    down to zero is marked "closed".
+
+    With `expected_version`, the write only applies if the debt is still
+    at that version (optimistic concurrency for clients that show a
+    balance before paying). Returns None if the debt does not exist for
+    this user; raises DebtVersionConflict on a version mismatch and
+    ValueError when the payments exceed the remaining amount or name a
+    wallet the user is not a member of (checked before anything is
+    written).
+    """
+    if today is None:
+        today = date.today()
+    wallet_ids = {item.wallet_id for item in items if item.wallet_id is not None}
+    unknown = wallet_ids - wallet_service.member_wallet_ids(db, user_id, wallet_ids)
+    if unknown:
+        raise ValueError(f"Wallet {', '.join(sorted(map(str, unknown)))} not found")
+    total = sum((item.amount_paid for item in items), Decimal("0"))
+
+    remaining = Debt.remaining_amount - total
+    stmt = (
+        update(Debt)
+        .where(
+            Debt.id == debt_id,
+            Debt.user_id == user_id,
+            Debt.remaining_amount >= total,
+        )
+        .values(
+            remaining_amount=remaining,
+            version=Debt.version + 1,
+            status=case((remaining == 0, "closed"), else_=Debt.status),
+        )
+        .returning(
+            Debt.remaining_amount,
+            Debt.status,
+            Debt.version,
+            Debt.wallet_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if expected_version is not None:
+        stmt = stmt.where(Debt.version == expected_version)
+
+    debt = db.execute(stmt).first()
+    if debt is None:
+        # Nothing was written; work out why for the caller
+        current = db.execute(
+            select(Debt.remaining_amount, Debt.version).where(
+                Debt.id == debt_id,
+                Debt.user_id == user_id,
+            )
+        ).first()
+        db.rollback()
+        if current is None:
+            return None
+        if expected_version is not None and current.version != expected_version:
+            raise DebtVersionConflict(
+                f"Debt is at version {current.version}, not {expected_version}"
+            )
+        raise ValueError(
+            f"Payments of {total} exceed the remaining amount of "
+            f"{current.remaining_amount}"
+        )
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "debt_id": debt_id,
+            "wallet_id": item.wallet_id or debt.wallet_id,
+            "amount_paid": item.amount_paid,
+            "payment_date": item.payment_date or today,
+            "payment_mode": item.payment_mode,
+            "note": item.note,
+        }
+        for item in items
+    ]
+    payments = db.scalars(insert(Payment).returning(Payment), rows).all()
+
+    planner_cache.bump_on_commit(db, [user_id])
+    db.commit()
+
+    return {
+        "debt_id": debt_id,
+        "remaining_amount": debt.remaining_amount,
+        "status": debt.status,
+        "version": debt.version,
+        "payments": payments,
+    }
+
+
+def list_payments(
+    db: Session,
+    user_id: UUID,
+    debt_id: UUID,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Payment], str | None] | None:
+    """
+    One keyset page of a debt's payments, newest first.
+
+    Ordered by (payment_date, id) descending and served from the
+    (debt_id, payment_date, id) index, like the transaction list. Returns
+    None if the debt does not exist for this user.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    owned = db.execute(
+        select(Debt.id).where(Debt.id == debt_id, Debt.user_id == user_id)
+    ).first()
+    if owned is None:
+        return None
+
+    query = db.query(Payment).filter(Payment.debt_id == debt_id)
+    if cursor is not None:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Payment.payment_date, Payment.id)
+            < tuple_(cursor_date, cursor_id)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    rows = (
+        query.order_by(Payment.payment_date.desc(), Payment.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.payment_date, last.id)
+
+    return rows, next_cursor
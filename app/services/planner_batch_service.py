@@ -0,0 +1,208 @@
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import date
+from typing import Deque, Dict, Iterator, List, Sequence, Tuple
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Debt, PlannerSnapshot, TransactionMonthlyRollup, User
+from app.db.session import SessionLocal
+from app.services.debt_simulator import DebtItem
+from app.services.planner_service import (
+    DEBT_ITEM_COLUMNS,
+    NON_LIVING_CATEGORIES,
+    OPEN_DEBT,
+    build_planner_report,
+    debt_item,
+    summarize,
+)
+
+
+CHUNK_USERS = 500
+
+# Inputs of one user: (user_id, total income, living expenses, debts)
+UserInputs = Tuple[UUID, float, float, List[DebtItem]]
+
+
+def make_executor(workers: int) -> ProcessPoolExecutor | None:
+    """
+    A spawned process pool of `workers` processes, or None for 1 (run
+    in-process); the batch counterpart of debt_strategy_service.get_executor.
+    """
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def iter_user_chunks(
+    db: Session,
+    chunk_size: int = CHUNK_USERS,
+    user_ids: Sequence[UUID] | None = None,
+) -> Iterator[List[UUID]]:
+    """
+    All user ids (or the given ones) in chunks, keyset-paginated on id.
+    """
+    last: UUID | None = None
+    while True:
+        stmt = select(User.id).order_by(User.id).limit(chunk_size)
+        if user_ids is not None:
+            stmt = stmt.where(User.id.in_(list(user_ids)))
+        if last is not None:
+            stmt = stmt.where(User.id > last)
+        chunk = db.execute(stmt).scalars().all()
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def load_chunk(db: Session, user_ids: Sequence[UUID]) -> List[UserInputs]:
+    """
+    Planner inputs for a chunk of users in two statements: income and
+    living expenses per user from the monthly rollups (one GROUP BY),
+    and every open debt of the chunk ordered by user.
+    """
+    R = TransactionMonthlyRollup
+    totals = {
+        user_id: (float(income), float(living))
+        for user_id, income, living in db.execute(
+            select(
+                R.user_id,
+                func.coalesce(func.sum(R.total).filter(R.type == "Income"), 0),
+                func.coalesce(
+                    func.sum(R.total).filter(
+                        R.type == "Expense",
+                        R.category.notin_(NON_LIVING_CATEGORIES),
+                    ),
+                    0,
+                ),
+            )
+            .where(R.user_id.in_(user_ids))
+            .group_by(R.user_id)
+        )
+    }
+
+    debts: Dict[UUID, List[DebtItem]] = {}
+    for row in db.execute(
+        select(Debt.user_id, *DEBT_ITEM_COLUMNS)
+        .where(Debt.user_id.in_(user_ids), *OPEN_DEBT)
+        .order_by(Debt.user_id, Debt.created_at, Debt.id)
+    ):
+        debts.setdefault(row.user_id, []).append(debt_item(row))
+
+    return [
+        (user_id, *totals.get(user_id, (0.0, 0.0)), debts.get(user_id, []))
+        for user_id in user_ids
+    ]
+
+
+def plan_chunk(inputs: List[UserInputs]) -> List[Dict]:
+    """
+    Planner reports for a loaded chunk. Pure CPU work with no DB access,
+    so it runs in a pool worker.
+    """
+    reports = []
+    for user_id, total_income, living_expenses, debts in inputs:
+        summary = summarize(total_income, living_expenses, debts)
+        reports.append({"user_id": user_id, **build_planner_report(summary, debts)})
+    return reports
+
+
+def run_batch(
+    executor: Executor | None,
+    max_in_flight: int,
+    chunk_size: int = CHUNK_USERS,
+    user_ids: Sequence[UUID] | None = None,
+) -> Iterator[List[Dict]]:
+    """
+    Planner reports for every user (or the given ones), one list per
+    chunk, in user id order.
+
+    This process only pages through users and loads each chunk's inputs
+    with load_chunk; the simulations run in `executor` with up to
+    `max_in_flight` chunks outstanding, so loading the next chunks
+    overlaps with planning the previous ones and throughput grows with
+    the number of workers until the DB reads become the bottleneck.
+    Without an executor chunks are planned in-process.
+
+    The generator owns its session so it can back a streaming response.
+    """
+    db = SessionLocal()
+    try:
+        pending: Deque[Future] = deque()
+        for chunk in iter_user_chunks(db, chunk_size, user_ids):
+            inputs = load_chunk(db, chunk)
+            if executor is None:
+                yield plan_chunk(inputs)
+                continue
+            pending.append(executor.submit(plan_chunk, inputs))
+            while len(pending) >= max_in_flight or (pending and pending[0].done()):
+                yield pending.popleft().result()
+        # Release the connection before waiting on the stragglers
+        db.close()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        db.close()
+
+
+def iter_ndjson(chunks: Iterator[List[Dict]], as_of: date) -> Iterator[bytes]:
+    """
+    One JSON line per user report.
+    """
+    for reports in chunks:
+        lines = [
+            json.dumps(jsonable_encoder({"as_of": as_of, **report}))
+            for report in reports
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def write_snapshots(
+    db: Session,
+    chunks: Iterator[List[Dict]],
+    as_of: date,
+) -> int:
+    """
+    Upsert each chunk's reports into planner_snapshots with one multi-row
+    INSERT ... ON CONFLICT (user_id, as_of) DO UPDATE, committed per
+    chunk. Returns the number of snapshots written.
+    """
+    written = 0
+    for reports in chunks:
+        if not reports:
+            continue
+        stmt = pg_insert(PlannerSnapshot).values(
+            [
+                {
+                    "user_id": report["user_id"],
+                    "as_of": as_of,
+                    "summary": jsonable_encoder(report["summary"]),
+                    "debt_plan": jsonable_encoder(report.get("debt_plan")),
+                    "error": report.get("error"),
+                }
+                for report in reports
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PlannerSnapshot.user_id, PlannerSnapshot.as_of],
+            set_={
+                "summary": stmt.excluded.summary,
+                "debt_plan": stmt.excluded.debt_plan,
+                "error": stmt.excluded.error,
+                "created_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+        written += len(reports)
+    return written
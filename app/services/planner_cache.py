@@ -0,0 +1,187 @@
+"""
+Memoized planner results, keyed by user and a per-user data version.
+
+Every write that can change a planner result (transactions, debts,
+materialized recurring runs) bumps the user's version once its DB
+transaction commits. Keys embed the version read *before* computing, so
+a result computed concurrently with a write is stored under the old
+version and never served again; stale entries simply age out.
+
+Backends:
+
+- in-process (default): LRU over PLANNER_CACHE_MAX_ENTRIES with a TTL.
+  Versions live in the process, so use it with a single worker.
+- Redis-compatible server (PLANNER_CACHE_URL=redis://...; Redis, Valkey,
+  KeyDB, ...): shared by all workers and processes. Entries get the TTL;
+  LRU is the server's maxmemory-policy. Needs the `redis` package.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple, TypeVar
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import (
+    PLANNER_CACHE_MAX_ENTRIES,
+    PLANNER_CACHE_TTL_SECONDS,
+    PLANNER_CACHE_URL,
+)
+
+
+T = TypeVar("T")
+
+_PENDING_KEY = "planner_cache_bump"
+
+
+class MemoryBackend:
+    """
+    Thread-safe in-process LRU with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self, user_key: str) -> int:
+        with self._lock:
+            return self._versions.get(user_key, 0)
+
+    def bump(self, user_key: str) -> None:
+        with self._lock:
+            self._versions[user_key] = self._versions.get(user_key, 0) + 1
+
+
+class RedisBackend:
+    """
+    Any server speaking the Redis protocol. Values are stored as JSON.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "PLANNER_CACHE_URL needs the 'redis' package (pip install redis)"
+            ) from exc
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl_seconds
+
+    def get(self, key: str) -> Any | None:
+        raw = self._client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.set(key, json.dumps(jsonable_encoder(value)), ex=self._ttl)
+
+    def version(self, user_key: str) -> int:
+        return int(self._client.get(f"{user_key}:version") or 0)
+
+    def bump(self, user_key: str) -> None:
+        self._client.incr(f"{user_key}:version")
+
+
+_backend: MemoryBackend | RedisBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def _enabled() -> bool:
+    return PLANNER_CACHE_TTL_SECONDS > 0
+
+
+def get_backend() -> MemoryBackend | RedisBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if PLANNER_CACHE_URL:
+                _backend = RedisBackend(PLANNER_CACHE_URL, PLANNER_CACHE_TTL_SECONDS)
+            else:
+                _backend = MemoryBackend(
+                    PLANNER_CACHE_MAX_ENTRIES, PLANNER_CACHE_TTL_SECONDS
+                )
+        return _backend
+
+
+def _user_key(user_id: UUID) -> str:
+    return f"planner:{user_id}"
+
+
+def cached(
+    name: str,
+    user_id: UUID,
+    params: Hashable,
+    compute: Callable[[], T],
+) -> T:
+    """
+    `compute()`'s result for (user, current data version, name, params),
+    from the cache when present. Exceptions are not cached.
+    """
+    if not _enabled():
+        return compute()
+
+    backend = get_backend()
+    user_key = _user_key(user_id)
+    # Read before computing; see the module docstring
+    key = f"{user_key}:{backend.version(user_key)}:{name}:{params!r}"
+
+    value = backend.get(key)
+    if value is None:
+        value = compute()
+        backend.set(key, value)
+    return value
+
+
+def bump_versions(user_ids: Iterable[UUID]) -> None:
+    """
+    Invalidate every cached planner result of these users.
+    """
+    if not _enabled():
+        return
+    backend = get_backend()
+    for user_id in user_ids:
+        backend.bump(_user_key(user_id))
+
+
+def bump_on_commit(db: Session, user_ids: Iterable[UUID]) -> None:
+    """
+    Schedule a version bump for when `db` commits (dropped on rollback).
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        bump_versions(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,13 +1,62 @@
 # app/services/planner_service.py
+from calendar import monthrange
+from datetime import date
+from typing import Dict, List, Tuple
 from uuid import UUID
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.db.models import Transaction, Debt
-from app.services.debt_simulator import DebtItem, simulate_debt_clearance
+from app.db.models import Debt, TransactionMonthlyRollup
+from app.services.debt_simulator import DebtItem, plan_debt_clearance
 
 
-def calculate_financial_summary(db: Session, user_id: UUID):
+NON_LIVING_CATEGORIES = ("Loan", "EMI", "Debt")
+
+# Debts that still take part in planning. Payments close a debt once its
+# balance reaches 0; from then on its EMI is no longer owed.
+OPEN_DEBT = (
+    Debt.status.is_distinct_from("closed"),
+    Debt.remaining_amount > 0,
+)
+
+GRANULARITIES = ("month", "quarter", "year")
+
+
+def _month_index(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+def _period_of(month_index: int, granularity: str) -> Tuple[str, date, date]:
+    """
+    Label and [start, end] dates of the period containing `month_index`.
+    """
+    year, month0 = divmod(month_index, 12)
+    if granularity == "year":
+        return str(year), date(year, 1, 1), date(year, 12, 31)
+    if granularity == "quarter":
+        quarter = month0 // 3
+        first, last = quarter * 3 + 1, quarter * 3 + 3
+        return (
+            f"{year}-Q{quarter + 1}",
+            date(year, first, 1),
+            date(year, last, monthrange(year, last)[1]),
+        )
+    month = month0 + 1
+    return (
+        f"{year}-{month:02d}",
+        date(year, month, 1),
+        date(year, month, monthrange(year, month)[1]),
+    )
+
+
+def calculate_financial_summary(
+    db: Session,
+    user_id: UUID,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    granularity: str | None = None,
+):
     """
     Compute the financial summary for a single user.
 
@@ -15,94 +64,218 @@ def calculate_financial_summary(db: Session, user_id: UUID):
     - Living Expenses (exclude loan/EMI/debt categories)
     - Mandatory EMI (only fixed-EMI debts, i.e. non-flexible)
     - Free Cash = Income − Living Expenses − Mandatory EMI
+
+    Everything is read in one statement: income and living expenses are
+    FILTER aggregates over the monthly rollups and mandatory EMI is a
+    scalar subquery on debts, so cost depends on the number of months,
+    not the number of transactions.
+
+    When a range or granularity is given, totals cover only the months in
+    [date_from, date_to] (whole months) and a `periods` list is added with
+    income, living expenses, mandatory EMI and free cash per month,
+    quarter or year. Mandatory EMI is a monthly figure, so it is counted
+    once for every month a period (and the range) covers.
     """
-    # Total Income
-    income_rows = (
-        db.query(Transaction.amount)
-        .filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "Income",
-        )
-        .all()
-    )
-    total_income = float(sum(i[0] or 0 for i in income_rows))
-
-    # Living Expenses (exclude loan/EMI/debt categories)
-    expense_rows = (
-        db.query(Transaction.amount)
-        .filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "Expense",
-            Transaction.category.notin_(["Loan", "EMI", "Debt"]),
-        )
-        .all()
-    )
-    living_expenses = float(sum(e[0] or 0 for e in expense_rows))
+    R = TransactionMonthlyRollup
 
-    # Mandatory EMI (only FIXED_EMI debts => non-flexible)
-    emi_rows = (
-        db.query(Debt.emi_amount)
-        .filter(
+    mandatory_emi_sq = (
+        select(func.coalesce(func.sum(Debt.emi_amount), 0))
+        .where(
             Debt.user_id == user_id,
             Debt.is_flexible.is_(False),
+            *OPEN_DEBT,
         )
-        .all()
+        .scalar_subquery()
+    )
+    income = func.coalesce(func.sum(R.total).filter(R.type == "Income"), 0)
+    living = func.coalesce(
+        func.sum(R.total).filter(
+            R.type == "Expense",
+            R.category.notin_(NON_LIVING_CATEGORIES),
+        ),
+        0,
+    )
+
+    if date_from is None and date_to is None and granularity is None:
+        total_income, living_expenses, mandatory_emi = db.execute(
+            select(income, living, mandatory_emi_sq).where(R.user_id == user_id)
+        ).one()
+        total_income = float(total_income)
+        living_expenses = float(living_expenses)
+        mandatory_emi = float(mandatory_emi)
+        free_cash = total_income - living_expenses - mandatory_emi
+
+        return {
+            "total_income": round(total_income, 2),
+            "living_expenses": round(living_expenses, 2),
+            "mandatory_emi": round(mandatory_emi, 2),
+            "free_cash": round(free_cash, 2),
+        }
+
+    granularity = granularity or "month"
+    month_index = R.year * 12 + R.month - 1
+
+    stmt = (
+        select(month_index, income, living, mandatory_emi_sq)
+        .where(R.user_id == user_id)
+        .group_by(month_index)
     )
-    # coerce Numeric/Decimal to float explicitly to avoid type errors
-    mandatory_emi = float(sum((e[0] or 0) for e in emi_rows))
+    if date_from is not None:
+        stmt = stmt.where(month_index >= _month_index(date_from))
+    if date_to is not None:
+        stmt = stmt.where(month_index <= _month_index(date_to))
+
+    by_month: Dict[int, Tuple[float, float]] = {}
+    mandatory_emi = None
+    for idx, month_income, month_living, emi in db.execute(stmt):
+        by_month[idx] = (float(month_income), float(month_living))
+        mandatory_emi = float(emi)
+
+    if mandatory_emi is None:
+        mandatory_emi = float(db.execute(select(mandatory_emi_sq)).scalar())
+
+    first = _month_index(date_from) if date_from else min(by_month, default=None)
+    last = _month_index(date_to) if date_to else max(by_month, default=None)
 
-    free_cash = float(total_income - living_expenses - mandatory_emi)
+    periods = []
+    if first is not None and last is not None:
+        range_start = _period_of(first, "month")[1]
+        range_end = _period_of(last, "month")[2]
+        for idx in range(first, last + 1):
+            label, start, end = _period_of(idx, granularity)
+            month_income, month_living = by_month.get(idx, (0.0, 0.0))
+            if not periods or periods[-1]["period"] != label:
+                periods.append(
+                    {
+                        "period": label,
+                        "start_date": max(start, range_start),
+                        "end_date": min(end, range_end),
+                        "total_income": 0.0,
+                        "living_expenses": 0.0,
+                        "mandatory_emi": 0.0,
+                    }
+                )
+            current = periods[-1]
+            current["total_income"] += month_income
+            current["living_expenses"] += month_living
+            current["mandatory_emi"] += mandatory_emi
+
+    for period in periods:
+        period["free_cash"] = round(
+            period["total_income"]
+            - period["living_expenses"]
+            - period["mandatory_emi"],
+            2,
+        )
+        for field in ("total_income", "living_expenses", "mandatory_emi"):
+            period[field] = round(period[field], 2)
+
+    # Range totals: EMI is owed once for every month in the range
+    total_income = sum(p["total_income"] for p in periods)
+    living_expenses = sum(p["living_expenses"] for p in periods)
+    range_emi = sum(p["mandatory_emi"] for p in periods)
+    free_cash = total_income - living_expenses - range_emi
 
     return {
-        "total_income": round(float(total_income), 2),
-        "living_expenses": round(float(living_expenses), 2),
-        "mandatory_emi": round(float(mandatory_emi), 2),
-        "free_cash": round(float(free_cash), 2),
+        "total_income": round(total_income, 2),
+        "living_expenses": round(living_expenses, 2),
+        "mandatory_emi": round(range_emi, 2),
+        "free_cash": round(free_cash, 2),
+        "periods": periods,
     }
 
 
-def run_financial_planner(db: Session, user_id: UUID):
+# Columns debt_item() reads from a debts row
+DEBT_ITEM_COLUMNS = (
+    Debt.id,
+    Debt.creditor_name,
+    Debt.remaining_amount,
+    Debt.emi_amount,
+    Debt.is_flexible,
+    Debt.priority,
+    Debt.interest_rate,
+)
+
+
+def debt_item(d) -> DebtItem:
     """
-    High-level planner for a single user:
-    - Calculates summary
-    - Runs debt clearance simulator
+    A debts row (DEBT_ITEM_COLUMNS) as a simulator input.
     """
-    summary = calculate_financial_summary(db, user_id=user_id)
+    return DebtItem(
+        name=d.creditor_name,
+        remaining=float(d.remaining_amount),
+        # Only non-flexible debts are treated as fixed EMI
+        emi=float(d.emi_amount)
+        if d.emi_amount is not None and not d.is_flexible
+        else None,
+        is_flexible=d.is_flexible,
+        priority=d.priority,
+        interest_rate=float(d.interest_rate or 0),
+        debt_id=d.id,
+    )
+
+
+def load_debt_items(db: Session, user_id: UUID) -> List[DebtItem]:
+    """
+    The user's open debts as simulator inputs.
+    """
+    debts = db.execute(
+        select(*DEBT_ITEM_COLUMNS)
+        .where(Debt.user_id == user_id, *OPEN_DEBT)
+        .order_by(Debt.created_at, Debt.id)
+    ).all()
+
+    return [debt_item(d) for d in debts]
+
+
+def summarize(
+    total_income: float,
+    living_expenses: float,
+    debts: List[DebtItem],
+) -> Dict:
+    """
+    The all-time financial summary from already loaded inputs; same
+    figures as calculate_financial_summary without a range.
+    """
+    mandatory_emi = sum(d.emi or 0 for d in debts)
+    return {
+        "total_income": round(total_income, 2),
+        "living_expenses": round(living_expenses, 2),
+        "mandatory_emi": round(mandatory_emi, 2),
+        "free_cash": round(total_income - living_expenses - mandatory_emi, 2),
+    }
 
+
+def build_planner_report(summary: Dict, debts: List[DebtItem]) -> Dict:
+    """
+    Summary plus debt clearance plan; shared by the per-user planner and
+    the batch runner.
+    """
     if summary["free_cash"] < 0:
         return {
             "summary": summary,
             "error": "Expenses + EMI exceed income",
         }
 
-    debts = (
-        db.query(Debt)
-        .filter(Debt.user_id == user_id)
-        .all()
-    )
-
-    debt_items: list[DebtItem] = []
-    for d in debts:
-        debt_items.append(
-            DebtItem(
-                name=d.creditor_name,
-                remaining=float(d.remaining_amount),
-                # Only non-flexible debts are treated as fixed EMI
-                emi=float(d.emi_amount)
-                if d.emi_amount is not None and not d.is_flexible
-                else None,
-                is_flexible=d.is_flexible,
-                priority=d.priority,
-            )
-        )
-
-    debt_plan = simulate_debt_clearance(
+    debt_plan = plan_debt_clearance(
         monthly_income=summary["total_income"],
         living_expenses=summary["living_expenses"],
-        debts=debt_items,
+        debts=debts,
     )
 
     return {
         "summary": summary,
         "debt_plan": debt_plan,
     }
+
+
+def run_financial_planner(db: Session, user_id: UUID):
+    """
+    High-level planner for a single user:
+    - Calculates summary
+    - Runs debt clearance simulator (payoff timeline)
+    """
+    summary = calculate_financial_summary(db, user_id=user_id)
+    if summary["free_cash"] < 0:
+        return build_planner_report(summary, [])
+    return build_planner_report(summary, load_debt_items(db, user_id))
@@ -6,6 +6,11 @@ from sqlalchemy.orm import Session
 
 from app.db.models import RecurringTransaction, Transaction
 from app.schemas.recurring import RecurringCreate, RecurringUpdate
+from app.services.rollup_service import RollupDeltas
+from app.services.transaction_service import (
+    apply_transaction_changes,
+    transaction_content_hash,
+)
 
 
 def _next_date(current: date, frequency: str) -> date:
@@ -154,6 +159,7 @@ def run_recurring_scheduler(
     )
 
     created_count = 0
+    deltas = RollupDeltas()
 
     for rt in due_items:
         # Check end_date
@@ -170,8 +176,16 @@ def run_recurring_scheduler(
             category=rt.category,
             amount=rt.amount,
             payment_mode=rt.payment_mode,
+            content_hash=transaction_content_hash(
+                user_id,
+                rt.next_run_date,
+                rt.amount,
+                rt.category,
+                rt.payment_mode,
+            ),
         )
         db.add(tx)
+        deltas.add_transaction(tx)
         created_count += 1
 
         # Move next_run_date forward
@@ -184,6 +198,7 @@ def run_recurring_scheduler(
         db.add(rt)
 
     if created_count > 0:
+        apply_transaction_changes(db, deltas)
         db.commit()
 
     return created_count
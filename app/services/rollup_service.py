@@ -0,0 +1,172 @@
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, Numeric, cast, delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Transaction, TransactionMonthlyRollup
+
+
+# Stands in for "no wallet" so wallet_id can be part of the primary key
+NO_WALLET = UUID(int=0)
+
+_CENT = Decimal("0.01")
+
+RollupKey = Tuple[UUID, UUID, int, int, str, str]
+
+
+def _to_money(amount: float) -> Decimal:
+    # Same rounding as Postgres' float -> numeric(14, 2) cast
+    return Decimal(str(amount)).quantize(_CENT, rounding=ROUND_HALF_UP)
+
+
+class RollupDeltas:
+    """
+    Signed (total, count) changes per rollup key, accumulated over one
+    unit of work and applied in a single statement.
+    """
+
+    def __init__(self):
+        self._deltas: Dict[RollupKey, List] = {}
+
+    def add(
+        self,
+        user_id: UUID,
+        wallet_id: UUID | None,
+        tx_date: date,
+        tx_type: str,
+        category: str,
+        amount: float,
+        sign: int = 1,
+    ) -> None:
+        key = (
+            user_id,
+            wallet_id or NO_WALLET,
+            tx_date.year,
+            tx_date.month,
+            tx_type,
+            category,
+        )
+        entry = self._deltas.setdefault(key, [Decimal("0"), 0])
+        entry[0] += sign * _to_money(amount)
+        entry[1] += sign
+
+    def add_transaction(self, tx: Transaction, sign: int = 1) -> None:
+        self.add(
+            tx.user_id,
+            tx.wallet_id,
+            tx.date,
+            tx.type,
+            tx.category,
+            tx.amount,
+            sign,
+        )
+
+    def items(self) -> List[Tuple[RollupKey, Decimal, int]]:
+        # Sorted so concurrent writers lock rollup rows in the same order
+        return [
+            (key, total, count)
+            for key, (total, count) in sorted(self._deltas.items())
+            if total != 0 or count != 0
+        ]
+
+    def user_ids(self) -> Set[UUID]:
+        # Includes keys whose deltas cancelled out (e.g. a date moved
+        # within the month): the rows changed even if the totals did not
+        return {key[0] for key in self._deltas}
+
+    def __bool__(self) -> bool:
+        return bool(self._deltas)
+
+
+def apply_deltas(db: Session, deltas: RollupDeltas) -> None:
+    """
+    Upsert the accumulated deltas into transaction_monthly_rollups.
+
+    Runs inside the caller's transaction; the caller commits.
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "wallet_id": wallet_id,
+            "year": year,
+            "month": month,
+            "type": tx_type,
+            "category": category,
+            "total": total,
+            "count": count,
+        }
+        for (user_id, wallet_id, year, month, tx_type, category), total, count
+        in deltas.items()
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(TransactionMonthlyRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            TransactionMonthlyRollup.user_id,
+            TransactionMonthlyRollup.wallet_id,
+            TransactionMonthlyRollup.year,
+            TransactionMonthlyRollup.month,
+            TransactionMonthlyRollup.type,
+            TransactionMonthlyRollup.category,
+        ],
+        set_={
+            "total": TransactionMonthlyRollup.total + stmt.excluded.total,
+            "count": TransactionMonthlyRollup.count + stmt.excluded.count,
+        },
+    )
+    db.execute(stmt)
+
+
+def rebuild_rollups(db: Session, user_id: UUID | None = None) -> int:
+    """
+    Recompute rollups from raw transactions, for one user or everyone.
+
+    Transaction writers are blocked for the duration (SHARE lock) so no
+    delta can slip in between the delete and the re-aggregation.
+    Returns the number of rollup rows written.
+    """
+    db.execute(text("LOCK TABLE transactions IN SHARE MODE"))
+
+    clear = delete(TransactionMonthlyRollup)
+    if user_id is not None:
+        clear = clear.where(TransactionMonthlyRollup.user_id == user_id)
+    db.execute(clear)
+
+    year = cast(func.extract("year", Transaction.date), Integer)
+    month = cast(func.extract("month", Transaction.date), Integer)
+    wallet = func.coalesce(Transaction.wallet_id, NO_WALLET)
+
+    source = select(
+        Transaction.user_id,
+        wallet,
+        year,
+        month,
+        Transaction.type,
+        Transaction.category,
+        func.sum(cast(Transaction.amount, Numeric(14, 2))),
+        func.count(),
+    ).group_by(
+        Transaction.user_id,
+        wallet,
+        year,
+        month,
+        Transaction.type,
+        Transaction.category,
+    )
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+
+    result = db.execute(
+        insert(TransactionMonthlyRollup).from_select(
+            ["user_id", "wallet_id", "year", "month", "type", "category", "total", "count"],
+            source,
+        )
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,304 @@
+from datetime import date
+from typing import Dict, List, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import SavingsGoal
+from app.schemas.savings_goal import SavingsGoalCreate
+from app.services import planner_cache, wallet_service
+
+
+# Long enough for any realistic goal; projections never run past it
+MAX_GOAL_MONTHS = 600
+
+# Months between contributions; weekly schedules are counted by day
+_INTERVAL_MONTHS = {"weekly": 0, "monthly": 1, "quarterly": 3, "yearly": 12}
+
+_NO_END = np.iinfo(np.int64).max // 2
+
+
+def _days(d: date) -> int:
+    return int(np.datetime64(d, "D").astype(np.int64))
+
+
+def _month(d: date) -> int:
+    return int(np.datetime64(d, "M").astype(np.int64))
+
+
+def _contribution_counts(
+    goals: Sequence,
+    month_first: np.ndarray,
+    month_last: np.ndarray,
+    today: date,
+) -> np.ndarray:
+    """
+    Number of scheduled contributions of each goal in each month, as a
+    (goals × months) matrix. Only dates from today onwards count; earlier
+    ones are assumed to be in `current_amount` already.
+
+    Weekly schedules count the dates start + 7k inside each month's
+    window. The other frequencies contribute on the start date's day of
+    month (clamped to short months) every 1, 3 or 12 months.
+    """
+    start = np.array([_days(g.start_date) for g in goals], dtype=np.int64)
+    end = np.array(
+        [_days(g.end_date) if g.end_date else _NO_END for g in goals],
+        dtype=np.int64,
+    )
+    interval = np.array(
+        [_INTERVAL_MONTHS[g.contribution_frequency] for g in goals],
+        dtype=np.int64,
+    )
+    start_month = np.array([_month(g.start_date) for g in goals], dtype=np.int64)
+    day_of_month = np.array([g.start_date.day - 1 for g in goals], dtype=np.int64)
+
+    # Each goal's open window inside each month
+    lo = np.maximum(np.maximum(month_first[None, :], _days(today)), start[:, None])
+    hi = np.minimum(month_last[None, :], end[:, None])
+    open_window = lo <= hi
+
+    weekly = np.maximum(
+        (hi - start[:, None]) // 7 + (start[:, None] - lo) // 7 + 1,
+        0,
+    )
+
+    month_index = np.arange(len(month_first)) + _month(today)
+    months_since = month_index[None, :] - start_month[:, None]
+    due_day = month_first[None, :] + np.minimum(
+        day_of_month[:, None], (month_last - month_first)[None, :]
+    )
+    calendar = (
+        (months_since >= 0)
+        & (months_since % np.maximum(interval, 1)[:, None] == 0)
+        & (due_day >= lo)
+        & (due_day <= hi)
+    )
+
+    return np.where(
+        open_window,
+        np.where(interval[:, None] == 0, weekly, calendar),
+        0,
+    )
+
+
+def project_goals(
+    goals: Sequence,
+    today: date,
+    include_projection: bool = False,
+    horizon_months: int = MAX_GOAL_MONTHS,
+) -> List[Dict]:
+    """
+    Project every goal's balance month by month, all goals at once.
+
+    Month 0 is the current month. Each month the balance earns a month of
+    interest (annual rate / 12, compounded monthly) and then receives
+    that month's scheduled contributions:
+
+        B[m] = B[m-1] * g + C[m],  g = 1 + rate / 1200
+
+    which unrolls to B[m] = g^m * (B[0] + sum_{k<=m} C[k] / g^k). So the
+    whole (goals × months) balance matrix is one cumulative sum, and the
+    completion month, the balance at the deadline and the extra monthly
+    amount that would close a shortfall (an annuity, read off the same
+    powers of g) are array reductions over it; 50 goals take one pass,
+    just like one.
+    """
+    if not goals:
+        return []
+
+    months = np.arange(horizon_months + 1)
+    calendar_month = np.datetime64(today, "M") + months
+    month_first = calendar_month.astype("datetime64[D]").astype(np.int64)
+    month_last = (calendar_month + 1).astype("datetime64[D]").astype(np.int64) - 1
+
+    target = np.array([float(g.target_amount) for g in goals])
+    current = np.array([float(g.current_amount or 0) for g in goals])
+    amount = np.array([float(g.contribution_amount or 0) for g in goals])
+    rate = np.array([float(g.annual_interest_rate or 0) / 1200 for g in goals])
+
+    contributions = amount[:, None] * _contribution_counts(
+        goals, month_first, month_last, today
+    )
+    contributions[:, 0] += current
+
+    growth = (1 + rate)[:, None] ** months[None, :]
+    balance = growth * np.cumsum(contributions / growth, axis=1)
+
+    # Half a cent of slack for float rounding
+    reached = balance >= target[:, None] - 0.005
+    ever = reached.any(axis=1)
+    completion = np.where(ever, reached.argmax(axis=1), -1)
+
+    has_deadline = np.array([g.target_date is not None for g in goals])
+    deadline = np.array(
+        [_month(g.target_date) - _month(today) if g.target_date else 0 for g in goals],
+        dtype=np.int64,
+    )
+    deadline = np.clip(deadline, 0, horizon_months)
+    rows = np.arange(len(goals))
+    at_deadline = balance[rows, deadline]
+    shortfall = target - at_deadline
+    shortfall = np.where(shortfall < 0.005, 0.0, shortfall)
+
+    # Level payment at the end of months 1..n that grows to the shortfall
+    n_growth = growth[rows, deadline]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(
+            rate > 0,
+            shortfall * rate / (n_growth - 1),
+            shortfall / deadline,
+        )
+    fixable = (deadline > 0) | (shortfall == 0)
+    # Rounded up to the cent so that paying it does reach the target
+    annuity = np.where(shortfall == 0, 0.0, np.ceil(annuity * 100 - 1e-6) / 100)
+
+    month_end_dates = month_last.astype("datetime64[D]")
+
+    results = []
+    for i, goal in enumerate(goals):
+        m = int(completion[i])
+        entry = {
+            "goal_id": goal.id,
+            "name": goal.name,
+            "target_amount": round(float(target[i]), 2),
+            "current_amount": round(float(current[i]), 2),
+            "target_date": goal.target_date,
+            "months_to_target": m if m >= 0 else None,
+            "projected_completion_date": (
+                month_end_dates[m].item() if m >= 0 else None
+            ),
+        }
+        if has_deadline[i]:
+            entry.update(
+                balance_at_target_date=round(float(at_deadline[i]), 2),
+                on_track=bool(shortfall[i] == 0),
+                shortfall=round(float(shortfall[i]), 2),
+                additional_monthly_contribution=(
+                    float(annuity[i]) if fixable[i] else None
+                ),
+            )
+        if include_projection:
+            last = max(m if m >= 0 else horizon_months, int(deadline[i]))
+            entry["projection"] = np.round(balance[i, : last + 1], 2).tolist()
+        results.append(entry)
+    return results
+
+
+def goal_projections(
+    db: Session,
+    user_id: UUID,
+    include_projection: bool = False,
+    today: date | None = None,
+) -> Dict:
+    if today is None:
+        today = date.today()
+    goals = db.execute(
+        select(
+            SavingsGoal.id,
+            SavingsGoal.name,
+            SavingsGoal.target_amount,
+            SavingsGoal.current_amount,
+            SavingsGoal.contribution_amount,
+            SavingsGoal.contribution_frequency,
+            SavingsGoal.start_date,
+            SavingsGoal.end_date,
+            SavingsGoal.annual_interest_rate,
+            SavingsGoal.target_date,
+        )
+        .where(SavingsGoal.user_id == user_id)
+        .order_by(SavingsGoal.created_at, SavingsGoal.id)
+    ).all()
+    return {
+        "as_of": today,
+        "horizon_months": MAX_GOAL_MONTHS,
+        "goals": project_goals(goals, today, include_projection),
+    }
+
+
+def list_goals(db: Session, user_id: UUID) -> List[SavingsGoal]:
+    return (
+        db.query(SavingsGoal)
+        .filter(SavingsGoal.user_id == user_id)
+        .order_by(SavingsGoal.created_at, SavingsGoal.id)
+        .all()
+    )
+
+
+def get_goal(db: Session, user_id: UUID, goal_id: UUID) -> SavingsGoal | None:
+    return (
+        db.query(SavingsGoal)
+        .filter(
+            SavingsGoal.id == goal_id,
+            SavingsGoal.user_id == user_id,
+        )
+        .first()
+    )
+
+
+def _apply_payload(
+    db: Session,
+    goal: SavingsGoal,
+    user_id: UUID,
+    payload: SavingsGoalCreate,
+) -> None:
+    start_date = payload.start_date or goal.start_date or date.today()
+    if payload.end_date is not None and payload.end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+    wallet_service.check_wallet_access(db, user_id, payload.wallet_id)
+
+    goal.name = payload.name
+    goal.target_amount = payload.target_amount
+    goal.current_amount = payload.current_amount
+    goal.contribution_amount = payload.contribution_amount
+    goal.contribution_frequency = payload.contribution_frequency
+    goal.start_date = start_date
+    goal.end_date = payload.end_date
+    goal.annual_interest_rate = payload.annual_interest_rate
+    goal.target_date = payload.target_date
+    goal.wallet_id = payload.wallet_id
+
+
+def create_goal(
+    db: Session,
+    user_id: UUID,
+    payload: SavingsGoalCreate,
+) -> SavingsGoal:
+    goal = SavingsGoal(user_id=user_id)
+    _apply_payload(db, goal, user_id, payload)
+
+    db.add(goal)
+    planner_cache.bump_on_commit(db, [user_id])
+    db.commit()
+    db.refresh(goal)
+    return goal
+
+
+def update_goal(
+    db: Session,
+    user_id: UUID,
+    goal_id: UUID,
+    payload: SavingsGoalCreate,
+) -> SavingsGoal | None:
+    goal = get_goal(db, user_id, goal_id)
+    if not goal:
+        return None
+    _apply_payload(db, goal, user_id, payload)
+
+    planner_cache.bump_on_commit(db, [user_id])
+    db.commit()
+    db.refresh(goal)
+    return goal
+
+
+def delete_goal(db: Session, user_id: UUID, goal_id: UUID) -> bool:
+    goal = get_goal(db, user_id, goal_id)
+    if not goal:
+        return False
+
+    db.delete(goal)
+    planner_cache.bump_on_commit(db, [user_id])
+    db.commit()
+    return True
@@ -4,6 +4,7 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 
 from app.db.models import Debt
+from app.services.planner_service import OPEN_DEBT
 
 
 def calculate_savings_plan(
@@ -25,6 +26,7 @@ def calculate_savings_plan(
         .filter(
             Debt.user_id == user_id,
             Debt.emi_amount.isnot(None),
+            *OPEN_DEBT,
         )
         .all()
     )
@@ -0,0 +1,371 @@
+"""
+Per-user columnar transaction cache shared by all worker processes.
+
+Each cached user is a directory under TRANSACTION_CACHE_DIR:
+
+    <user_id>/TOKEN            current generation (random hex)
+    <user_id>/<token>/         date.npy, amount.npy, kind.npy, category.npy,
+                               categories.json
+
+Arrays are opened with mmap, so every uvicorn worker reads the same page
+cache instead of holding its own copy. A committed transaction write
+replaces TOKEN, which makes the published generation unreachable; the
+next reader rebuilds. Builders read TOKEN before querying and publish
+under that token only, so a build that raced with a write can never be
+served. Least recently used users are evicted once the directory grows
+past TRANSACTION_CACHE_MAX_BYTES.
+"""
+import io
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, List
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.config import TRANSACTION_CACHE_DIR, TRANSACTION_CACHE_MAX_BYTES
+from app.db.models import TransactionMonthlyRollup
+
+
+EPOCH = date(1970, 1, 1)
+
+# Values of the `kind` column
+KIND_EXPENSE = 0
+KIND_INCOME = 1
+KIND_OTHER = 2
+
+_TOKEN_FILE = "TOKEN"
+_PENDING_KEY = "transaction_cache_invalidate"
+
+
+@dataclass
+class TransactionColumns:
+    """
+    One user's transactions as parallel arrays, sorted by date.
+
+    `date` is days since 1970-01-01, `kind` is one of the KIND_* flags
+    and `category` indexes `categories`.
+    """
+
+    date: np.ndarray
+    amount: np.ndarray
+    kind: np.ndarray
+    category: np.ndarray
+    categories: List[str]
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    def between(self, date_from: date, date_to: date) -> "TransactionColumns":
+        """
+        Rows with date_from <= date <= date_to (a view, no copy).
+        """
+        lo = np.searchsorted(self.date, (date_from - EPOCH).days, side="left")
+        hi = np.searchsorted(self.date, (date_to - EPOCH).days, side="right")
+        return TransactionColumns(
+            date=self.date[lo:hi],
+            amount=self.amount[lo:hi],
+            kind=self.kind[lo:hi],
+            category=self.category[lo:hi],
+            categories=self.categories,
+        )
+
+
+def _enabled() -> bool:
+    return bool(TRANSACTION_CACHE_DIR)
+
+
+def _user_dir(user_id: UUID) -> str:
+    return os.path.join(TRANSACTION_CACHE_DIR, str(user_id))
+
+
+def _read_token(user_dir: str) -> str | None:
+    try:
+        with open(os.path.join(user_dir, _TOKEN_FILE)) as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_token(user_dir: str) -> str:
+    token = uuid.uuid4().hex
+    tmp = os.path.join(user_dir, f".{_TOKEN_FILE}.{token}")
+    with open(tmp, "w") as fh:
+        fh.write(token)
+    os.replace(tmp, os.path.join(user_dir, _TOKEN_FILE))
+    return token
+
+
+def _open(generation_dir: str) -> TransactionColumns:
+    with open(os.path.join(generation_dir, "categories.json")) as fh:
+        categories = json.load(fh)
+    arrays = {
+        name: np.load(os.path.join(generation_dir, f"{name}.npy"), mmap_mode="r")
+        for name in ("date", "amount", "kind", "category")
+    }
+    return TransactionColumns(categories=categories, **arrays)
+
+
+def peek(user_id: UUID) -> TransactionColumns | None:
+    """
+    The user's cached columns if warm, otherwise None. Never hits the DB.
+    """
+    if not _enabled():
+        return None
+    user_dir = _user_dir(user_id)
+    token = _read_token(user_dir)
+    if token is None:
+        return None
+    try:
+        columns = _open(os.path.join(user_dir, token))
+    except (FileNotFoundError, ValueError):
+        return None
+    try:
+        # Directory mtime doubles as the LRU clock
+        os.utime(user_dir)
+    except OSError:
+        pass
+    return columns
+
+
+# One fixed-width row of the binary COPY below: a field count, then
+# (length, value) per column, all big-endian
+_COPY_ROW = np.dtype(
+    [
+        ("fields", ">i2"),
+        ("date_len", ">i4"), ("date", ">i4"),
+        ("amount_len", ">i4"), ("amount", ">f8"),
+        ("kind_len", ">i4"), ("kind", ">i2"),
+        ("category_len", ">i4"), ("category", ">i4"),
+    ]
+)
+_COPY_HEADER = 19
+_COPY_TRAILER = 2
+
+_COPY_SQL = f"""
+COPY (
+    SELECT
+        (date - DATE '1970-01-01')::int4,
+        amount::float8,
+        (CASE type
+            WHEN 'Expense' THEN {KIND_EXPENSE}
+            WHEN 'Income' THEN {KIND_INCOME}
+            ELSE {KIND_OTHER}
+        END)::int2,
+        (COALESCE(array_position(%(categories)s::text[], category::text), 0) - 1)::int4
+    FROM transactions
+    WHERE user_id = %(user_id)s
+    ORDER BY date
+) TO STDOUT WITH (FORMAT binary)
+"""
+
+
+def _categories(db: Session, user_id: UUID) -> List[str]:
+    # From the (small) rollups so codes can be assigned in SQL
+    R = TransactionMonthlyRollup
+    return [
+        row[0]
+        for row in db.execute(
+            select(R.category)
+            .where(R.user_id == user_id, R.count > 0)
+            .distinct()
+            .order_by(R.category)
+        )
+    ]
+
+
+def _copy_columns(
+    db: Session,
+    user_id: UUID,
+    categories: List[str],
+) -> TransactionColumns:
+    buffer = io.BytesIO()
+    cursor = db.connection().connection.cursor()
+    try:
+        sql = cursor.mogrify(
+            _COPY_SQL, {"categories": categories, "user_id": str(user_id)}
+        ).decode()
+        cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+
+    payload = buffer.getbuffer()[_COPY_HEADER:-_COPY_TRAILER]
+    rows = np.frombuffer(payload, dtype=_COPY_ROW)
+
+    return TransactionColumns(
+        date=rows["date"].astype(np.int32),
+        amount=rows["amount"].astype(np.float64),
+        kind=rows["kind"].astype(np.int8),
+        category=rows["category"].astype(np.int32),
+        categories=categories,
+    )
+
+
+def _load_from_db(
+    db: Session,
+    user_id: UUID,
+    attempts: int = 2,
+) -> TransactionColumns | None:
+    """
+    Load every transaction of the user as columns.
+
+    Rows are streamed with a binary COPY; every column is NOT NULL and
+    fixed-width, so the payload is decoded by NumPy in one frombuffer
+    call instead of building a Python object per row.
+
+    The category list and the COPY are separate statements, so a
+    transaction with a new category committed in between comes back
+    with code -1. The load is then retried with a fresh category list;
+    if that keeps happening, None is returned and the caller reads
+    through SQL instead.
+    """
+    for _ in range(attempts):
+        columns = _copy_columns(db, user_id, _categories(db, user_id))
+        if not len(columns) or columns.category.min() >= 0:
+            return columns
+    return None
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _evict(keep: str) -> None:
+    """
+    Drop least recently used users until the cache fits its byte cap.
+    """
+    try:
+        entries = [
+            entry for entry in os.scandir(TRANSACTION_CACHE_DIR) if entry.is_dir()
+        ]
+    except FileNotFoundError:
+        return
+
+    sized = []
+    total = 0
+    for entry in entries:
+        size = _dir_size(entry.path)
+        total += size
+        try:
+            used = entry.stat().st_mtime
+        except OSError:
+            continue
+        sized.append((used, entry.path, size))
+
+    for _, path, size in sorted(sized):
+        if total <= TRANSACTION_CACHE_MAX_BYTES:
+            return
+        if path == keep:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def _publish(user_dir: str, token: str, columns: TransactionColumns) -> None:
+    staging = os.path.join(user_dir, f".build-{uuid.uuid4().hex}")
+    os.makedirs(staging)
+    try:
+        for name in ("date", "amount", "kind", "category"):
+            np.save(os.path.join(staging, f"{name}.npy"), getattr(columns, name))
+        with open(os.path.join(staging, "categories.json"), "w") as fh:
+            json.dump(columns.categories, fh)
+
+        if _read_token(user_dir) == token:
+            # Fails if another worker published this generation first
+            os.rename(staging, os.path.join(user_dir, token))
+            staging = None
+    finally:
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    # Older generations are unreachable; mapped files stay valid until closed
+    live = {token, _read_token(user_dir)}
+    for entry in os.scandir(user_dir):
+        if entry.is_dir() and entry.name not in live and not entry.name.startswith("."):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def get_columns(db: Session, user_id: UUID) -> TransactionColumns | None:
+    """
+    Read-through access: the cached columns, building and publishing them
+    first if the user is cold. Returns None when the cache is disabled or
+    the columns could not be loaded consistently (see _load_from_db);
+    callers then use their SQL path.
+
+    Publishing is best effort; the freshly loaded columns are returned
+    even if they could not be written (e.g. the user was evicted
+    meanwhile).
+    """
+    if not _enabled():
+        return None
+
+    columns = peek(user_id)
+    if columns is not None:
+        return columns
+
+    user_dir = _user_dir(user_id)
+    os.makedirs(user_dir, exist_ok=True)
+    # Must be read before querying: a write committing after this point
+    # replaces the token and the result below is never published
+    token = _read_token(user_dir) or _write_token(user_dir)
+
+    columns = _load_from_db(db, user_id)
+    if columns is None:
+        return None
+
+    try:
+        _publish(user_dir, token, columns)
+    except OSError:
+        pass
+    _evict(keep=user_dir)
+    return columns
+
+
+def invalidate(user_ids: Iterable[UUID]) -> None:
+    """
+    Make the cached generation of each user unreachable.
+
+    Call only after the write has committed, otherwise a concurrent
+    rebuild could capture the pre-write state under the new token.
+    """
+    if not _enabled():
+        return
+    for user_id in user_ids:
+        user_dir = _user_dir(user_id)
+        try:
+            _write_token(user_dir)
+        except FileNotFoundError:
+            # Not cached (or evicted meanwhile): nothing to invalidate
+            pass
+
+
+def invalidate_on_commit(db: Session, user_ids: Iterable[UUID]) -> None:
+    """
+    Schedule invalidation for when `db` commits (dropped on rollback).
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        invalidate(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,373 @@
+import base64
+import hashlib
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, List, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import Select, insert, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.db.models import Transaction
+from app.schemas.transaction import TransactionBulkItemResult, TransactionCreate
+from app.services import (
+    budget_alert_service,
+    planner_cache,
+    rollup_service,
+    transaction_cache,
+    wallet_service,
+)
+from app.services.rollup_service import RollupDeltas
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+MAX_BULK_ITEMS = 10_000
+
+
+@dataclass
+class TransactionFilters:
+    """
+    Server-side filters shared by the list and export endpoints.
+    """
+
+    date_from: date | None = None
+    date_to: date | None = None
+    type: str | None = None
+    category: str | None = None
+    payment_mode: str | None = None
+    wallet_id: UUID | None = None
+
+
+def transaction_content_hash(
+    user_id: UUID,
+    tx_date: date,
+    amount: float,
+    category: str,
+    payment_mode: str | None,
+    occurrence: int = 0,
+) -> str:
+    """
+    Stable identity of a transaction's content, used to dedupe imports.
+
+    `occurrence` distinguishes genuinely repeated identical rows within
+    one statement (two equal purchases on the same day): the n-th copy
+    hashes differently from the first, so re-importing the statement
+    matches each copy instead of collapsing them.
+    """
+    parts = [
+        str(user_id),
+        tx_date.isoformat(),
+        f"{float(amount):.2f}",
+        category.strip().lower(),
+        (payment_mode or "").strip().lower(),
+    ]
+    if occurrence:
+        parts.append(str(occurrence))
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def apply_transaction_changes(db: Session, deltas: RollupDeltas) -> None:
+    """
+    Propagate inserted/updated/deleted transactions to derived tables.
+
+    Every transaction write path calls this before committing, so the
+    derived data (rollups, budget spent counters and their alerts) changes
+    in the same DB transaction as the rows. The columnar cache and
+    memoized planner results are invalidated once that transaction
+    commits.
+    """
+    rollup_service.apply_deltas(db, deltas)
+    budget_alert_service.apply_spent_deltas(db, deltas)
+    user_ids = deltas.user_ids()
+    transaction_cache.invalidate_on_commit(db, user_ids)
+    planner_cache.bump_on_commit(db, user_ids)
+
+
+def encode_cursor(tx_date: date, tx_id: UUID) -> str:
+    """
+    Opaque keyset cursor pointing at the last row of a page.
+    """
+    raw = f"{tx_date.isoformat()}|{tx_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_part, id_part = raw.split("|", 1)
+        return date.fromisoformat(date_part), UUID(id_part)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def apply_filters(
+    query: Query | Select,
+    user_id: UUID,
+    filters: TransactionFilters,
+) -> Query | Select:
+    """
+    Scope a legacy Query or a 2.0-style select() to the user and filters.
+    """
+    query = query.filter(Transaction.user_id == user_id)
+
+    if filters.date_from is not None:
+        query = query.filter(Transaction.date >= filters.date_from)
+    if filters.date_to is not None:
+        query = query.filter(Transaction.date <= filters.date_to)
+    if filters.type is not None:
+        query = query.filter(Transaction.type == filters.type)
+    if filters.category is not None:
+        query = query.filter(Transaction.category == filters.category)
+    if filters.payment_mode is not None:
+        query = query.filter(Transaction.payment_mode == filters.payment_mode)
+    if filters.wallet_id is not None:
+        query = query.filter(Transaction.wallet_id == filters.wallet_id)
+
+    return query
+
+
+def list_transactions(
+    db: Session,
+    user_id: UUID,
+    filters: TransactionFilters,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Transaction], str | None]:
+    """
+    One keyset page of the user's transactions, newest first.
+
+    Rows are ordered by (date, id) descending and the cursor carries the
+    last (date, id) seen, so every page is a bounded index range scan no
+    matter how deep it is. Returns the page and the cursor for the next
+    page (None when this is the last one).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    query = apply_filters(db.query(Transaction), user_id, filters)
+
+    if cursor is not None:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Transaction.date, Transaction.id)
+            < tuple_(cursor_date, cursor_id)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    rows = (
+        query.order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.date, last.id)
+
+    return rows, next_cursor
+
+
+def get_transaction(
+    db: Session,
+    user_id: UUID,
+    transaction_id: UUID,
+) -> Transaction | None:
+    return (
+        db.query(Transaction)
+        .filter(
+            Transaction.id == transaction_id,
+            Transaction.user_id == user_id,
+        )
+        .first()
+    )
+
+
+def _apply_payload(
+    db: Session,
+    tx: Transaction,
+    user_id: UUID,
+    payload: TransactionCreate,
+) -> None:
+    """
+    Copy a validated payload onto `tx`. Raises ValueError if the payload
+    names a wallet the user is not a member of.
+    """
+    wallet_service.check_wallet_access(db, user_id, payload.wallet_id)
+
+    tx.date = payload.date
+    tx.type = payload.type
+    tx.category = payload.category
+    tx.amount = payload.amount
+    tx.payment_mode = payload.payment_mode
+    tx.wallet_id = payload.wallet_id
+    tx.content_hash = transaction_content_hash(
+        user_id,
+        payload.date,
+        payload.amount,
+        payload.category,
+        payload.payment_mode,
+    )
+
+
+def create_transaction(
+    db: Session,
+    user_id: UUID,
+    payload: TransactionCreate,
+) -> Transaction:
+    tx = Transaction(user_id=user_id)
+    _apply_payload(db, tx, user_id, payload)
+    db.add(tx)
+
+    deltas = RollupDeltas()
+    deltas.add_transaction(tx)
+    apply_transaction_changes(db, deltas)
+
+    db.commit()
+    db.refresh(tx)
+    return tx
+
+
+def update_transaction(
+    db: Session,
+    user_id: UUID,
+    transaction_id: UUID,
+    payload: TransactionCreate,
+) -> Transaction | None:
+    tx = get_transaction(db, user_id, transaction_id)
+    if not tx:
+        return None
+
+    deltas = RollupDeltas()
+    deltas.add_transaction(tx, sign=-1)
+    _apply_payload(db, tx, user_id, payload)
+    deltas.add_transaction(tx)
+
+    db.add(tx)
+    apply_transaction_changes(db, deltas)
+    db.commit()
+    db.refresh(tx)
+    return tx
+
+
+def delete_transaction(
+    db: Session,
+    user_id: UUID,
+    transaction_id: UUID,
+) -> bool:
+    tx = get_transaction(db, user_id, transaction_id)
+    if not tx:
+        return False
+
+    deltas = RollupDeltas()
+    deltas.add_transaction(tx, sign=-1)
+
+    db.delete(tx)
+    apply_transaction_changes(db, deltas)
+    db.commit()
+    return True
+
+
+def bulk_create_transactions(
+    db: Session,
+    user_id: UUID,
+    items: List[Any],
+) -> List[TransactionBulkItemResult]:
+    """
+    Validate a batch of raw transaction payloads and insert the valid ones
+    in a single database transaction.
+
+    Invalid items, including ones naming a wallet the user is not a
+    member of, are reported per index and skipped; they do not abort the
+    rest of the batch. Wallet ids are checked for the whole batch with one
+    membership query. Ids are generated client-side so the insert is one
+    executemany, which SQLAlchemy turns into batched multi-row
+    `INSERT ... VALUES` statements on psycopg2 (no per-row round trip and
+    no refresh SELECT).
+    """
+    results: List[TransactionBulkItemResult] = []
+    payloads: List[Tuple[int, TransactionCreate]] = []
+
+    for index, raw in enumerate(items):
+        try:
+            payloads.append((index, TransactionCreate.model_validate(raw)))
+        except ValidationError as exc:
+            results.append(
+                TransactionBulkItemResult(
+                    index=index,
+                    status="invalid",
+                    errors=exc.errors(
+                        include_url=False,
+                        include_context=False,
+                        include_input=False,
+                    ),
+                )
+            )
+
+    wallets = wallet_service.member_wallet_ids(
+        db, user_id, (payload.wallet_id for _, payload in payloads)
+    )
+
+    rows: List[dict] = []
+    deltas = RollupDeltas()
+    for index, payload in payloads:
+        if payload.wallet_id is not None and payload.wallet_id not in wallets:
+            results.append(
+                TransactionBulkItemResult(
+                    index=index,
+                    status="invalid",
+                    errors=[
+                        {
+                            "type": "wallet_not_found",
+                            "loc": ["wallet_id"],
+                            "msg": f"Wallet {payload.wallet_id} not found",
+                        }
+                    ],
+                )
+            )
+            continue
+
+        tx_id = uuid.uuid4()
+        rows.append(
+            {
+                "id": tx_id,
+                "user_id": user_id,
+                "wallet_id": payload.wallet_id,
+                "date": payload.date,
+                "type": payload.type,
+                "category": payload.category,
+                "amount": payload.amount,
+                "payment_mode": payload.payment_mode,
+                "content_hash": transaction_content_hash(
+                    user_id,
+                    payload.date,
+                    payload.amount,
+                    payload.category,
+                    payload.payment_mode,
+                ),
+            }
+        )
+        deltas.add(
+            user_id,
+            payload.wallet_id,
+            payload.date,
+            payload.type,
+            payload.category,
+            payload.amount,
+        )
+        results.append(
+            TransactionBulkItemResult(index=index, status="created", id=tx_id)
+        )
+
+    if rows:
+        db.execute(insert(Transaction), rows)
+        apply_transaction_changes(db, deltas)
+        db.commit()
+
+    results.sort(key=lambda result: result.index)
+    return results
@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 from uuid import UUID
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.models import Wallet, WalletMember
@@ -67,6 +68,41 @@ def get_wallet_for_user(
     )
 
 
+def member_wallet_ids(
+    db: Session,
+    user_id: UUID,
+    wallet_ids: Iterable[UUID | None],
+) -> Set[UUID]:
+    """
+    The subset of `wallet_ids` the user is a member of, in one query.
+    Unknown ids and wallets of other users are simply left out.
+    """
+    wanted = {wallet_id for wallet_id in wallet_ids if wallet_id is not None}
+    if not wanted:
+        return set()
+    return set(
+        db.execute(
+            select(WalletMember.wallet_id).where(
+                WalletMember.user_id == user_id,
+                WalletMember.wallet_id.in_(wanted),
+            )
+        ).scalars()
+    )
+
+
+def check_wallet_access(
+    db: Session,
+    user_id: UUID,
+    wallet_id: UUID | None,
+) -> None:
+    """
+    Raise ValueError unless `wallet_id` is None or a wallet the user is a
+    member of. Call before writing a wallet_id supplied by the client.
+    """
+    if wallet_id is not None and not member_wallet_ids(db, user_id, [wallet_id]):
+        raise ValueError(f"Wallet {wallet_id} not found")
+
+
 def get_user_role_in_wallet(
     db: Session,
     user_id: UUID,
@@ -0,0 +1,50 @@
+import os
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def db():
+    """
+    A session on DATABASE_URL (PostgreSQL) with the schema created.
+    Skipped when no database is configured.
+    """
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL is not set")
+
+    from app.db.database import engine
+    from app.db.models import Base
+    from app.db.session import SessionLocal
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    """A throwaway user, removed with all its rows afterwards."""
+    from sqlalchemy import delete
+
+    from app.db.models import (
+        Debt,
+        Payment,
+        Transaction,
+        TransactionMonthlyRollup,
+        User,
+    )
+
+    user = User(email=f"{uuid.uuid4()}@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    yield user
+
+    db.rollback()
+    for model in (Payment, Debt, TransactionMonthlyRollup, Transaction):
+        db.execute(delete(model).where(model.user_id == user.id))
+    db.execute(delete(User).where(User.id == user.id))
+    db.commit()
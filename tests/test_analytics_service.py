@@ -0,0 +1,49 @@
+from datetime import date
+from decimal import Decimal
+
+from app.schemas.transaction import TransactionCreate
+
+
+def _expense(category: str) -> TransactionCreate:
+    return TransactionCreate(
+        date=date(2026, 3, 10),
+        type="Expense",
+        category=category,
+        amount=Decimal("25.00"),
+        payment_mode="Cash",
+    )
+
+
+def test_monthly_trends_skip_zero_count_rollups(db, user):
+    from app.db.models import TransactionMonthlyRollup
+    from app.services import analytics_service, transaction_service
+
+    tx = transaction_service.create_transaction(db, user.id, _expense("Food"))
+    transaction_service.create_transaction(db, user.id, _expense("Rent"))
+    # Recategorizing leaves a zero-count rollup row behind for "Food"
+    transaction_service.update_transaction(db, user.id, tx.id, _expense("Travel"))
+
+    food = (
+        db.query(TransactionMonthlyRollup)
+        .filter(
+            TransactionMonthlyRollup.user_id == user.id,
+            TransactionMonthlyRollup.category == "Food",
+        )
+        .one()
+    )
+    assert food.count == 0
+
+    days, amounts, codes, categories = analytics_service.load_category_totals(
+        db, user.id, date(2026, 1, 1), date(2026, 6, 30), granularity="month"
+    )
+    assert categories == ["Rent", "Travel"]
+    # Monthly rows are dated the 1st of their month
+    march = (date(2026, 3, 1) - analytics_service.EPOCH).days
+    assert days.tolist() == [march, march]
+    assert sorted(codes.tolist()) == [0, 1]
+    assert amounts.sum() == 50.0
+
+    trends = analytics_service.get_spending_trends(
+        db, user.id, date(2026, 1, 1), date(2026, 6, 30), granularity="month"
+    )
+    assert [s["category"] for s in trends["series"]] == ["Rent", "Travel"]
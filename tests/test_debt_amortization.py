@@ -0,0 +1,31 @@
+from app.services.debt_amortization import amortize_debts
+from app.services.debt_simulator import DebtItem
+
+
+def test_second_flexible_debt_starts_receiving_cash():
+    # 1,000 a month of free cash. The card clears in month 3 with 0.50
+    # left over, which is less than a month of the loan's interest, so
+    # the loan's balance still grows that month; it has been waiting
+    # (and accruing) since month 1 and is paid off from month 4 on.
+    debts = [
+        DebtItem("Card", 2999.50, None, True, priority=1),
+        DebtItem("Loan", 3000.00, None, True, priority=2, interest_rate=12.0),
+    ]
+
+    plan = amortize_debts(1500.0, 500.0, debts, include_breakdown=True)
+
+    timeline = {entry["debt"]: entry for entry in plan["timeline"]}
+    assert timeline["Card"]["payoff_month"] == 3
+    assert timeline["Loan"]["payoff_month"] is not None
+    assert plan["total_months"] == timeline["Loan"]["payoff_month"]
+
+    # Interest capitalized while waiting is interest, not principal
+    assert timeline["Loan"]["principal_paid"] == 3000.00
+    loan_paid = sum(
+        payment["amount"]
+        for month in plan["monthly_breakdown"]
+        for payment in month["payments"]
+        if payment["debt"] == "Loan"
+    )
+    assert round(loan_paid - 3000.00, 2) == timeline["Loan"]["interest_paid"]
+    assert timeline["Loan"]["interest_paid"] > 0
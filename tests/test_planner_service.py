@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+from app.schemas.payment import PaymentCreate
+
+
+def test_closed_debt_no_longer_counts_towards_mandatory_emi(db, user):
+    from app.db.models import Debt
+    from app.services import payment_service
+    from app.services.planner_service import (
+        calculate_financial_summary,
+        load_debt_items,
+    )
+
+    car = Debt(
+        user_id=user.id,
+        creditor_name="Car loan",
+        total_amount=Decimal("1000.00"),
+        remaining_amount=Decimal("1000.00"),
+        emi_amount=Decimal("200.00"),
+        is_flexible=False,
+    )
+    home = Debt(
+        user_id=user.id,
+        creditor_name="Home loan",
+        total_amount=Decimal("50000.00"),
+        remaining_amount=Decimal("50000.00"),
+        emi_amount=Decimal("500.00"),
+        is_flexible=False,
+    )
+    db.add_all([car, home])
+    db.commit()
+
+    assert calculate_financial_summary(db, user.id)["mandatory_emi"] == 700.0
+
+    receipt = payment_service.record_payments(
+        db, user.id, car.id, [PaymentCreate(amount_paid=Decimal("1000.00"))]
+    )
+    assert receipt["status"] == "closed"
+
+    summary = calculate_financial_summary(db, user.id)
+    assert summary["mandatory_emi"] == 500.0
+    assert summary["free_cash"] == -500.0
+    assert [d.name for d in load_debt_items(db, user.id)] == ["Home loan"]
@@ -0,0 +1,37 @@
+from datetime import date
+from decimal import Decimal
+
+from app.schemas.transaction import TransactionCreate
+
+
+def test_stale_category_list_falls_back_to_sql(db, user, tmp_path, monkeypatch):
+    from app.services import analytics_service, transaction_cache, transaction_service
+
+    monkeypatch.setattr(transaction_cache, "TRANSACTION_CACHE_DIR", str(tmp_path))
+    transaction_service.create_transaction(
+        db,
+        user.id,
+        TransactionCreate(
+            date=date(2026, 3, 10),
+            type="Expense",
+            category="Food",
+            amount=Decimal("25.00"),
+            payment_mode="Cash",
+        ),
+    )
+
+    # As if "Food" was committed between reading the categories and the COPY
+    monkeypatch.setattr(transaction_cache, "_categories", lambda db, user_id: [])
+    assert transaction_cache.get_columns(db, user.id) is None
+    assert transaction_cache.peek(user.id) is None
+
+    trends = analytics_service.get_spending_trends(
+        db, user.id, date(2026, 3, 1), date(2026, 3, 31), granularity="week"
+    )
+    assert [s["category"] for s in trends["series"]] == ["Food"]
+
+    monkeypatch.undo()
+    monkeypatch.setattr(transaction_cache, "TRANSACTION_CACHE_DIR", str(tmp_path))
+    columns = transaction_cache.get_columns(db, user.id)
+    assert columns.categories == ["Food"]
+    assert columns.category.tolist() == [0]